@@ -1,32 +1,47 @@
 import os
 import time
+import queue
+import atexit
+import asyncio
 import logging
-import tempfile
+import logging.handlers
 import shutil
 import base64
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 import glob
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+# Prefer pybase64's SIMD decoder for large Base64 payloads, fall back to the stdlib
+try:
+    import pybase64 as b64codec
+except ImportError:
+    import base64 as b64codec
 
 # Import our custom modules
 from rtabmap_service import RTABMapService
+from workflow_service import WorkflowServiceManager
+from search_product import search_products
+from wayfinder_service import close_wayfinder_client
 
-# Set logging to DEBUG to see detailed output
-logging.basicConfig(format="%(asctime)s [%(levelname)s] %(message)s", level=logging.DEBUG)
+# Log at INFO by default (set LOG_LEVEL=DEBUG to see detailed output).
+# Records are handed to a background QueueListener thread so that writing to
+# stderr never blocks the event loop.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=LOG_LEVEL, handlers=[_log_queue_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger("rtabmap_api")
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="RTAB-Map API",
-    description="RTAB-Map localization API with integrated object search functionality",
-    version="1.1",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
 # Global variables
 rtabmap_service = None
 workflow_service = None
@@ -36,6 +51,14 @@ DATA_DIR = Path("/data")
 DB_FILE_PATH = DATA_DIR / "database.db"       # Embedded database
 METADATA_DB_FILE_PATH = Path("/app/data/database/IGA-V2.db")  # Metadata database with ObjMeta table
 EXTERNAL_TESTIMAGE_DIR = Path("/external_testimage")  # External test image directory
+ALLOWED_IMAGE_TYPES = frozenset({"image/jpeg", "image/png", "image/bmp", "image/jpg"})
+TEST_IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif"})  # Matched case-insensitively
+
+# Upload limits
+MAX_IMAGE_SIZE_BYTES = 10 * 1024 * 1024  # 10 MB limit for uploaded/decoded images
+UPLOAD_CHUNK_SIZE = 1024 * 1024          # Read uploads in 1 MB chunks
+BASE64_CHUNK_SIZE = 1024 * 1024          # Base64 characters decoded per chunk (multiple of 4)
+BASE64_WHITESPACE = b" \t\r\n"
 
 # --- Pydantic Models for API Endpoints ---
 
@@ -106,33 +129,147 @@ class SearchLocalizeResponse(BaseModel):
     timing_ms: Optional[Dict[str, float]] = Field(None, description="Timing information for performance analysis")
     error_message: Optional[str] = Field(None, description="Error message if workflow failed")
 
+def decode_base64_image(encoded: bytes) -> bytearray:
+    """
+    Decodes Base64 data in fixed-size chunks into a single buffer.
+    Stops as soon as the decoded size exceeds the upload limit instead of
+    decoding the whole payload first.
+    """
+    view = memoryview(encoded)
+    image_bytes = bytearray()
+    for start in range(0, len(view), BASE64_CHUNK_SIZE):
+        image_bytes += b64codec.b64decode(view[start:start + BASE64_CHUNK_SIZE], validate=False)
+        if len(image_bytes) > MAX_IMAGE_SIZE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail="Decoded image too large. Maximum size: 10 MB"
+            )
+    return image_bytes
+
+async def _acquire_image_bytes(image: Optional[UploadFile], image_base64: Optional[str]) -> Tuple[bytearray, str]:
+    """
+    Produces the raw image bytes and a file name from either a Base64 string or a
+    file upload, enforcing the same size limit on both. Raises HTTPException on
+    invalid or oversized input.
+    """
+    if image_base64:
+        logger.info("Processing Base64-encoded image")
+        
+        # Remove data URI prefix if present (e.g., "data:image/jpeg;base64,")
+        image_base64 = image_base64.partition(",")[2] or image_base64
+        
+        try:
+            encoded = image_base64.encode("ascii")
+        except UnicodeEncodeError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid Base64 format: {str(e)}"
+            )
+        
+        # Drop line breaks/whitespace so every decode chunk stays 4-byte aligned
+        if any(ws in encoded for ws in BASE64_WHITESPACE):
+            encoded = encoded.translate(None, BASE64_WHITESPACE)
+        
+        # Reject oversized payloads from their encoded length before decoding anything
+        estimated_size = (len(encoded) * 3) // 4 - encoded[-2:].count(b"=")
+        if estimated_size > MAX_IMAGE_SIZE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Decoded image too large. Maximum size: 10 MB. Received: {estimated_size / (1024 * 1024):.2f} MB"
+            )
+        
+        # Decode the Base64 payload chunk by chunk into an in-memory buffer
+        try:
+            image_bytes = await asyncio.to_thread(decode_base64_image, encoded)
+        except HTTPException:
+            raise
+        except base64.binascii.Error as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid Base64 image data: {str(e)}"
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid Base64 format: {str(e)}"
+            )
+
+        logger.info(f"Base64 image decoded successfully: {len(image_bytes) / (1024 * 1024):.2f} MB")
+        return image_bytes, "base64_image.jpg"
+
+    # File upload
+    logger.info(f"Received image upload: {image.filename}, content_type: {image.content_type}")
+    
+    # Validate file type
+    if image.content_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid image format. Allowed formats: JPEG, PNG, BMP. Received: {image.content_type}"
+        )
+    
+    # Keep the extension of the uploaded file so RTAB-Map recognizes the format
+    file_extension = Path(image.filename or "").suffix or ".jpg"  # Default to JPEG if no extension
+    
+    # Read the upload in chunks, enforcing the 10 MB limit as chunks arrive
+    image_bytes = bytearray()
+    try:
+        while chunk := await image.read(UPLOAD_CHUNK_SIZE):
+            if len(image_bytes) + len(chunk) > MAX_IMAGE_SIZE_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail="Image file too large. Maximum size: 10 MB"
+                )
+            image_bytes += chunk
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to read uploaded image: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to process uploaded image: {str(e)}"
+        )
+
+    logger.info(f"Image validation passed: {len(image_bytes) / (1024 * 1024):.2f} MB")
+    return image_bytes, f"upload_image{file_extension}"
+
+# Cached result of get_test_image_path(), invalidated when the directory mtime changes
+_test_image_cache = {"path": None, "mtime": None}
+
 def get_test_image_path():
     """
     Finds the first image file in the external test image directory.
     Supports common image formats: jpg, jpeg, png, bmp, tiff, tif
+    
+    The result is cached and only recomputed when the directory's mtime
+    changes (an image was added, removed or renamed).
     """
-    if not EXTERNAL_TESTIMAGE_DIR.exists():
+    try:
+        dir_mtime = EXTERNAL_TESTIMAGE_DIR.stat().st_mtime
+    except FileNotFoundError:
         raise FileNotFoundError(f"External test image directory not found: {EXTERNAL_TESTIMAGE_DIR}")
     
-    # Common image file extensions
-    image_extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff', '*.tif']
+    cached_path = _test_image_cache["path"]
+    if cached_path is not None and _test_image_cache["mtime"] == dir_mtime and cached_path.exists():
+        return cached_path
     
-    for pattern in image_extensions:
-        image_files = list(EXTERNAL_TESTIMAGE_DIR.glob(pattern))
-        image_files.extend(list(EXTERNAL_TESTIMAGE_DIR.glob(pattern.upper())))  # Check uppercase too
-        
-        if image_files:
-            # Return the first image found
-            selected_image = image_files[0]
-            logger.info(f"Found test image: {selected_image}")
-            return selected_image
+    # Single directory pass, returning the first file with a supported image extension
+    with os.scandir(EXTERNAL_TESTIMAGE_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in TEST_IMAGE_EXTENSIONS:
+                selected_image = Path(entry.path)
+                logger.info(f"Found test image: {selected_image}")
+                _test_image_cache["path"] = selected_image
+                _test_image_cache["mtime"] = dir_mtime
+                return selected_image
     
+    _test_image_cache["path"] = None
     raise FileNotFoundError(f"No image files found in external directory: {EXTERNAL_TESTIMAGE_DIR}")
 
-@app.on_event("startup")
-async def startup_event():
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     """
-    Initialize the RTAB-Map service with the embedded database at startup.
+    Initialize the RTAB-Map service with the embedded database at startup,
+    and properly shut it down when the application is closing.
     """
     global rtabmap_service, workflow_service
     logger.info("Starting RTAB-Map API service...")
@@ -142,23 +279,30 @@ async def startup_event():
         logger.error(f"Embedded database not found: {DB_FILE_PATH}")
         raise RuntimeError(f"Embedded database not found: {DB_FILE_PATH}")
     
-    # Check if the external test image directory exists and contains an image
-    try:
-        test_image_path = get_test_image_path()
-        logger.info(f"Using external test image: {test_image_path}")
-    except FileNotFoundError as e:
-        logger.warning(f"External test image directory not available: {e}. Localization endpoints will not work without mounted test images.")
-        test_image_path = None
-    
-    # Initialize the RTAB-Map service once at startup
+    # Initialize the RTAB-Map service once at startup while the external
+    # test image directory is scanned in a worker thread
     rtabmap_service = RTABMapService()
-    if not await rtabmap_service.initialize(DB_FILE_PATH, METADATA_DB_FILE_PATH):
+    init_result, test_image_result = await asyncio.gather(
+        rtabmap_service.initialize(DB_FILE_PATH, METADATA_DB_FILE_PATH),
+        asyncio.to_thread(get_test_image_path),
+        return_exceptions=True
+    )
+    
+    if isinstance(test_image_result, FileNotFoundError):
+        logger.warning(f"External test image directory not available: {test_image_result}. Localization endpoints will not work without mounted test images.")
+    elif isinstance(test_image_result, BaseException):
+        raise test_image_result
+    else:
+        logger.info(f"Using external test image: {test_image_result}")
+    
+    if isinstance(init_result, BaseException):
+        raise init_result
+    if not init_result:
         logger.error("Failed to initialize RTAB-Map service at startup")
         raise RuntimeError("Failed to initialize RTAB-Map service")
     
     # Initialize the workflow service for search-and-localize functionality
     try:
-        from workflow_service import WorkflowServiceManager
         workflow_service = WorkflowServiceManager.initialize(rtabmap_service, str(DB_FILE_PATH), str(METADATA_DB_FILE_PATH))
         logger.info("WorkflowService initialized successfully")
     except Exception as e:
@@ -168,34 +312,62 @@ async def startup_event():
     logger.info(f"RTAB-Map service initialized successfully with database: {DB_FILE_PATH}")
     logger.info(f"External test image directory: {EXTERNAL_TESTIMAGE_DIR}")
     logger.info("All services initialized - API ready for requests")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    Properly shuts down the RTAB-Map service when the application is closing.
-    """
-    global workflow_service
+    
+    yield
+    
     if rtabmap_service:
         await rtabmap_service.shutdown()
         logger.info("RTAB-Map service shut down successfully.")
     
     if workflow_service:
-        from workflow_service import WorkflowServiceManager
         WorkflowServiceManager.reset()
         workflow_service = None
         logger.info("WorkflowService shut down successfully.")
+    
+    await close_wayfinder_client()
+
+# Initialize FastAPI app
+# With ENV=prod the OpenAPI schema and the /docs and /redoc pages are not served at all
+IS_PRODUCTION = os.environ.get("ENV", "").lower() == "prod"
+app = FastAPI(
+    title="RTAB-Map API",
+    description="RTAB-Map localization API with integrated object search functionality",
+    version="1.1",
+    docs_url=None if IS_PRODUCTION else "/docs",
+    redoc_url=None if IS_PRODUCTION else "/redoc",
+    openapi_url=None if IS_PRODUCTION else "/openapi.json",
+    lifespan=lifespan
+)
 
 # Enable CORS
+# CORS_ORIGINS is a comma-separated allowlist (e.g. "http://172.20.10.2:8080").
+# Without it any origin is allowed, but credentials are disabled so Starlette can
+# send a static "Access-Control-Allow-Origin: *" instead of echoing each Origin.
+ALLOWED_ORIGINS = [origin.strip() for origin in os.environ.get("CORS_ORIGINS", "").split(",") if origin.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=ALLOWED_ORIGINS or ["*"],
+    allow_credentials=bool(ALLOWED_ORIGINS),
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
 )
 
 # --- API Endpoints ---
 
+# Constant parts of the /status and /health payloads, built once at import
+_STATIC_STATUS = {
+    "status": "ok",
+    "embedded_db": str(DB_FILE_PATH),
+    "external_directory": str(EXTERNAL_TESTIMAGE_DIR),
+    "available_endpoints": ["/health", "/status", "/localize", "/search-and-localize"],
+}
+_STATIC_HEALTH = {
+    "status": "ok",
+    "service": "rtabmap-api",
+    "version": "1.1",
+    "features": ["localization", "search-and-localize", "object-search"],
+}
+
 @app.get("/status")
 async def service_status():
     """
@@ -221,13 +393,10 @@ async def service_status():
             workflow_status = {"error": f"Failed to get workflow status: {e}"}
     
     return {
-        "status": "ok",
+        **_STATIC_STATUS,
         "rtabmap_service": service_status,
         "workflow_service": workflow_status,
-        "embedded_db": str(DB_FILE_PATH),
         "external_test_image": test_image_status,
-        "external_directory": str(EXTERNAL_TESTIMAGE_DIR),
-        "available_endpoints": ["/health", "/status", "/localize", "/search-and-localize"],
         "timestamp": time.time()
     }
 
@@ -236,13 +405,7 @@ async def health_check():
     """
     Simple health check to confirm the API is running.
     """
-    return {
-        "status": "ok",
-        "service": "rtabmap-api",
-        "version": "1.1",
-        "features": ["localization", "search-and-localize", "object-search"],
-        "timestamp": time.time()
-    }
+    return {**_STATIC_HEALTH, "timestamp": time.time()}
 
 @app.post("/search-and-localize", response_model=SearchLocalizeResponse, tags=["Integrated Workflow"])
 async def search_and_localize(
@@ -282,9 +445,6 @@ async def search_and_localize(
     Returns:
         SearchLocalizeResponse with search results, localization data, and navigation guidance
     """
-    temp_image_path = None
-    cleanup_temp_file = False
-    
     try:
         # Step 0: Validate input - either image file or Base64 string must be provided
         if not image and not image_base64:
@@ -306,140 +466,25 @@ async def search_and_localize(
                 detail="Workflow service not available. Please check service initialization."
             )
         
-        # Step 2: Handle Base64 image if provided
-        if image_base64:
-            logger.info("Processing Base64-encoded image")
-            
-            try:
-                # Remove data URI prefix if present (e.g., "data:image/jpeg;base64,")
-                if "," in image_base64:
-                    logger.debug("Removing data URI prefix from Base64 string")
-                    image_base64 = image_base64.split(",", 1)[1]
-                
-                # Decode Base64 string to bytes
-                image_bytes = base64.b64decode(image_base64)
-                
-                # Validate decoded size (10 MB limit)
-                file_size_mb = len(image_bytes) / (1024 * 1024)
-                if file_size_mb > 10:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Decoded image too large. Maximum size: 10 MB. Received: {file_size_mb:.2f} MB"
-                    )
-                
-                logger.info(f"Base64 image decoded successfully: {file_size_mb:.2f} MB")
-                
-            except base64.binascii.Error as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid Base64 image data: {str(e)}"
-                )
-            except ValueError as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid Base64 format: {str(e)}"
-                )
-            
-            # Create temporary file for Base64 image
-            try:
-                # Create temporary directory in /data/temp_uploads
-                temp_dir = DATA_DIR / "temp_uploads"
-                temp_dir.mkdir(parents=True, exist_ok=True)
-                
-                # Create temporary file with .jpg extension
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    suffix=".jpg",
-                    dir=str(temp_dir),
-                    prefix="base64_"
-                )
-                temp_image_path = Path(temp_file.name)
-                
-                # Write decoded bytes to file
-                temp_file.write(image_bytes)
-                temp_file.close()
-                
-                cleanup_temp_file = True
-                logger.info(f"Base64 image saved to: {temp_image_path}")
-                
-            except Exception as e:
-                logger.error(f"Failed to save Base64 image: {e}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to process Base64 image: {str(e)}"
-                )
-        
-        # Step 3: Handle file upload if provided (existing logic)
-        elif image:
-            logger.info(f"Received image upload: {image.filename}, content_type: {image.content_type}")
-            
-            # Validate file type
-            allowed_types = ["image/jpeg", "image/png", "image/bmp", "image/jpg"]
-            if image.content_type not in allowed_types:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid image format. Allowed formats: JPEG, PNG, BMP. Received: {image.content_type}"
-                )
-            
-            # Validate file size (10 MB limit)
-            file_content = await image.read()
-            file_size_mb = len(file_content) / (1024 * 1024)
-            
-            if file_size_mb > 10:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Image file too large. Maximum size: 10 MB. Received: {file_size_mb:.2f} MB"
-                )
-            
-            logger.info(f"Image validation passed: {file_size_mb:.2f} MB")
-            
-            # Save uploaded image to temporary file
-            try:
-                # Create a temporary file with the same extension as the uploaded file
-                file_extension = Path(image.filename).suffix
-                if not file_extension:
-                    file_extension = ".jpg"  # Default to JPEG if no extension
-                
-                # Create temporary file in the /data directory (mounted volume)
-                temp_dir = DATA_DIR / "temp_uploads"
-                temp_dir.mkdir(parents=True, exist_ok=True)
-                
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    suffix=file_extension,
-                    dir=str(temp_dir),
-                    prefix="upload_"
-                )
-                temp_image_path = Path(temp_file.name)
-                
-                # Write the image content to the temporary file
-                temp_file.write(file_content)
-                temp_file.close()
-                
-                cleanup_temp_file = True
-                logger.info(f"Saved uploaded image to: {temp_image_path}")
-                
-            except Exception as e:
-                logger.error(f"Failed to save uploaded image: {e}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to process uploaded image: {str(e)}"
-                )
+        # Step 2: Read the image (Base64 string or file upload) into memory
+        image_bytes, image_name = await _acquire_image_bytes(image, image_base64)
         
-        # Step 4: Execute the integrated workflow with the uploaded image
+        # Step 3: Execute the integrated workflow with the uploaded image
         logger.info(f"Processing search-and-localize request for object: {object_name}")
         
         result = await workflow_service.execute_workflow(
             object_name=object_name,
             include_timing=include_timing,
-            image_path=temp_image_path  # Pass the uploaded image path
+            image_bytes=image_bytes,  # Pass the uploaded image in memory
+            image_name=image_name
         )
         
         # Log the workflow result for debugging
         logger.info(f"Workflow completed with status: {result.get('workflow_status')}")
         
-        # Return the structured response
-        return SearchLocalizeResponse(**result)
+        # Return the workflow dict as-is; FastAPI validates it once against response_model
+        # (building SearchLocalizeResponse here would validate and dump it a second time)
+        return result
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -450,14 +495,6 @@ async def search_and_localize(
             status_code=500, 
             detail=f"Internal server error during workflow execution: {str(e)}"
         )
-    finally:
-        # Step 5: Clean up temporary file
-        if cleanup_temp_file and temp_image_path and temp_image_path.exists():
-            try:
-                temp_image_path.unlink()
-                logger.debug(f"Cleaned up temporary image: {temp_image_path}")
-            except Exception as e:
-                logger.warning(f"Failed to clean up temporary image {temp_image_path}: {e}")
 
 @app.post("/search", tags=["Search"])
 async def search_only(request: SearchLocalizeRequest):
@@ -468,11 +505,9 @@ async def search_only(request: SearchLocalizeRequest):
     matching frames and object locations without triggering localization.
     """
     try:
-        # Import search functionality
-        from search_product import search_products
-        
         # Perform the search using the existing database path
-        search_results = search_products(
+        search_results = await asyncio.to_thread(
+            search_products,
             search_term=request.object_name,
             db_path=str(METADATA_DB_FILE_PATH),
             use_sql_prefilter=True,
@@ -480,17 +515,14 @@ async def search_only(request: SearchLocalizeRequest):
         )
         
         # Format results for API response
-        formatted_results = []
-        for result in search_results:
-            formatted_result = {
+        formatted_results = [
+            {
                 "frame_id": result['frame_id'],
-                "location": {
-                    "x": result['x'],
-                    "y": result['y']
-                },
+                "location": {"x": result['x'], "y": result['y']},
                 "objects": result['objects']
             }
-            formatted_results.append(formatted_result)
+            for result in search_results
+        ]
         
         return {
             "success": True,
@@ -1,9 +1,12 @@
+import asyncio
 import httpx
 
+from wayfinder_service import get_wayfinder_client, close_wayfinder_client
+
 # The URL for the wayfinder service
 WAYFINDER_URL = "https://fe00-34-73-69-124.ngrok-free.app/wayfinder"
 
-def initialize_wayfinder():
+async def initialize_wayfinder():
     """
     Initializes the wayfinder system by sending a one-time setup request.
     Sends a payload with source and destination information.
@@ -21,13 +24,13 @@ def initialize_wayfinder():
     print(f"Payload: {payload}")
     
     try:
-        # Use a synchronous client for this one-off script
-        with httpx.Client() as client:
-            response = client.post(WAYFINDER_URL, json=payload)
-            response.raise_for_status()  # Raise an exception for bad status codes (like 404 or 500)
-            print("\nSuccessfully initialized wayfinder!")
-            print(f"Response: {response.json()}")
-            return response.json()
+        # Reuse the shared Wayfinder client (keeps the TLS connection for later updates)
+        client = get_wayfinder_client()
+        response = await client.post(WAYFINDER_URL, json=payload)
+        response.raise_for_status()  # Raise an exception for bad status codes (like 404 or 500)
+        print("\nSuccessfully initialized wayfinder!")
+        print(f"Response: {response.json()}")
+        return response.json()
     except httpx.HTTPStatusError as e:
         # Handle HTTP status errors (e.g., 404, 500)
         print(f"\nError initializing wayfinder: {e}")
@@ -39,6 +42,13 @@ def initialize_wayfinder():
         print(f"Error details: {e}")
         return {"error": str(e)}
 
+async def main():
+    """Runs the initialization request and closes the shared client."""
+    try:
+        await initialize_wayfinder()
+    finally:
+        await close_wayfinder_client()
+
 if __name__ == "__main__":
     # Entry point for the script
-    initialize_wayfinder()
+    asyncio.run(main())
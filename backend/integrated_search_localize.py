@@ -11,6 +11,7 @@ Requirements:
 - Docker container must be running on port 8040
 - Existing search_product.py functionality available
 - RTAB-Map database accessible
+- Python dependencies from requirements.txt (including httpx)
 
 Usage:
     python integrated_search_localize.py
@@ -20,27 +21,24 @@ Usage:
 
 import sys
 import time
+import asyncio
 import json
 import logging
 import argparse
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Optional
 
-try:
-    import requests
-except ImportError:
-    print("Error: 'requests' library not found. Installing...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "requests"])
-    import requests
+import httpx
 
 # Import workflow functionality
 try:
     from workflow_service import WorkflowService
     from rtabmap_service import RTABMapService
+    from navigation_guidance import add_navigation_guidance, format_search_results_with_distances, format_navigation_display
 except ImportError as e:
     print(f"Error: Could not import workflow functionality: {e}")
-    print("Please ensure workflow_service.py and rtabmap_service.py are available.")
+    print("Please ensure workflow_service.py, rtabmap_service.py, search_product.py and navigation_guidance.py are available.")
     sys.exit(1)
 
 # Configure logging
@@ -56,6 +54,13 @@ API_BASE_URL = "http://localhost:8040"
 DATABASE_PATH = r"C:\Users\kasra\Desktop\Kasra\Telegram\Fall 2025\ECSE 542 Final Report\store-navigator\backend\data\database\IGA-V2.db"
 REQUEST_TIMEOUT = 30  # seconds
 
+# Field extractors for the WorkflowService localization result schema
+_POSITION_FIELDS = itemgetter("x", "y", "z")
+_ORIENTATION_FIELDS = itemgetter("roll", "pitch", "yaw")
+
+_DB_PATH: Path = Path(DATABASE_PATH)  # Built once instead of re-wrapping DATABASE_PATH per call
+_DB_EXISTS_CACHED: Optional[bool] = None  # Result of the first check_database_exists() call
+
 
 class RTABMapIntegratedClient:
     """
@@ -75,6 +80,14 @@ class RTABMapIntegratedClient:
         self.debug = debug
         self.workflow_service = None
         self.rtabmap_service = None
+        
+        # Async HTTP client so API calls don't block the event loop and reuse keep-alive connections
+        self._http = httpx.AsyncClient(
+            base_url=API_BASE_URL,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=4),
+            transport=httpx.AsyncHTTPTransport(retries=2)
+        )
         if debug:
             logging.getLogger().setLevel(logging.DEBUG)
             logger.debug("Debug mode enabled")
@@ -87,18 +100,20 @@ class RTABMapIntegratedClient:
             True if initialization successful, False otherwise
         """
         try:
-            # Check database exists first
-            if not self.check_database_exists():
-                return False
-            
-            # Initialize RTAB-Map service
+            # Check the database and initialize the RTAB-Map service concurrently
             self.rtabmap_service = RTABMapService()
-            if not await self.rtabmap_service.initialize(Path(DATABASE_PATH)):
+            database_exists, rtabmap_initialized = await asyncio.gather(
+                asyncio.to_thread(self.check_database_exists),
+                self.rtabmap_service.initialize(_DB_PATH)
+            )
+            if not database_exists:
+                return False
+            if not rtabmap_initialized:
                 logger.error("Failed to initialize RTAB-Map service")
                 return False
             
             # Initialize workflow service
-            self.workflow_service = WorkflowService(self.rtabmap_service, DATABASE_PATH)
+            self.workflow_service = WorkflowService(self.rtabmap_service, str(_DB_PATH), str(_DB_PATH))
             logger.info("Services initialized successfully for CLI usage")
             return True
             
@@ -106,7 +121,7 @@ class RTABMapIntegratedClient:
             logger.error(f"Service initialization failed: {e}")
             return False
     
-    def check_api_health(self) -> bool:
+    async def check_api_health(self) -> bool:
         """
         Check if the RTAB-Map API is accessible and healthy.
         
@@ -115,10 +130,7 @@ class RTABMapIntegratedClient:
         """
         try:
             logger.info("Checking API health...")
-            response = requests.get(
-                f"{API_BASE_URL}/health",
-                timeout=REQUEST_TIMEOUT
-            )
+            response = await self._http.get("/health")
             
             if response.status_code == 200:
                 health_data = response.json()
@@ -128,11 +140,11 @@ class RTABMapIntegratedClient:
                 logger.error(f"API health check failed with status {response.status_code}")
                 return False
                 
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             logger.error("Cannot connect to RTAB-Map API. Is the Docker container running?")
             logger.error(f"Expected URL: {API_BASE_URL}")
             return False
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"API health check timed out after {REQUEST_TIMEOUT} seconds")
             return False
         except Exception as e:
@@ -146,13 +158,15 @@ class RTABMapIntegratedClient:
         Returns:
             True if database exists, False otherwise
         """
-        db_path = Path(DATABASE_PATH)
-        if db_path.exists():
-            logger.debug(f"Database found at: {DATABASE_PATH}")
-            return True
+        global _DB_EXISTS_CACHED
+        if _DB_EXISTS_CACHED is None:
+            _DB_EXISTS_CACHED = _DB_PATH.is_file()
+        
+        if _DB_EXISTS_CACHED:
+            logger.debug(f"Database found at: {_DB_PATH}")
         else:
-            logger.error(f"Database not found at: {DATABASE_PATH}")
-            return False
+            logger.error(f"Database not found at: {_DB_PATH}")
+        return _DB_EXISTS_CACHED
     
     async def execute_workflow_with_cli_output(self, search_term: str) -> bool:
         """
@@ -171,50 +185,24 @@ class RTABMapIntegratedClient:
             
             print(f"\nSearching for \"{search_term}\"...\n")
             
-            # Step 1: Do search first and show results immediately
-            logger.info(f"Starting product search for: {search_term}")
-            
-            from search_product import search_products
-            search_results = search_products(
-                search_term=search_term,
-                db_path=DATABASE_PATH,
-                use_sql_prefilter=True,
-                show_performance=False
-            )
-            
-            logger.info(f"Product search completed: {len(search_results)} matches found")
-            
-            # Step 2: Now do localization to get user position
+            # Step 1: Run the workflow service, which performs the product search and
+            # localization (to get user position); its search results are reused below
             print("Triggering localization...")
-            logger.info("Starting automatic localization...")
-            
-            # Use the workflow service for complete workflow (to get user position)
             result = await self.workflow_service.execute_workflow(
                 object_name=search_term,
                 include_timing=self.debug
             )
+            search_results = result.get("search_results", [])
             
-            # Step 3: Add navigation guidance using localization results
+            # Step 2: Add navigation guidance using localization results
             if result.get("success") and result.get("localization_results"):
                 localization_results = result["localization_results"]
                 user_position = localization_results["position"]  # x, y, z
                 user_yaw = localization_results["orientation"]["yaw"]  # radians
                 
-                # Convert search results to format expected by navigation
-                formatted_search_results = []
-                for search_result in search_results:
-                    formatted_result = {
-                        "frame_id": search_result['frame_id'],
-                        "location": {"x": search_result['x'], "y": search_result['y']},
-                        "objects": search_result['objects']
-                    }
-                    formatted_search_results.append(formatted_result)
-                
-                # Get navigation guidance
-                from navigation_guidance import add_navigation_guidance, format_search_results_with_distances, format_navigation_display
-                
+                # Get navigation guidance (workflow search results are already in its format)
                 navigation_data = add_navigation_guidance(
-                    search_results=formatted_search_results,
+                    search_results=search_results,
                     user_position=user_position,
                     user_yaw=user_yaw,
                     object_name=search_term
@@ -223,6 +211,7 @@ class RTABMapIntegratedClient:
                 # Display enhanced search results with distances
                 print(format_search_results_with_distances(
                     all_frames=navigation_data['all_frames_with_distances'],
+                    distances=navigation_data['distances'],
                     nearest_frame=navigation_data['nearest_frame'],
                     multiple_frames_message=navigation_data['multiple_frames_message']
                 ))
@@ -248,96 +237,102 @@ class RTABMapIntegratedClient:
         """
         Display search results immediately when found.
         
+        The output is assembled first and written to stdout in a single call.
+        
         Args:
-            search_results: List of search results from search_product
+            search_results: List of search results from the workflow service
         """
+        lines = ["--- Search Results ---"]
         if not search_results:
-            print("--- Search Results ---")
-            print("No products found matching your search.")
-            print()
+            lines.append("No products found matching your search.")
+            lines.append("")
         else:
-            print("--- Search Results ---")
-            print(f"Found {len(search_results)} matches:\n")
+            lines.append(f"Found {len(search_results)} matches:\n")
             
             for i, result in enumerate(search_results, 1):
-                frame_id = result['frame_id']
-                x = result['x']
-                y = result['y']
                 objects = result['objects']
-                
-                print(f"{i}. Frame {frame_id}")
-                print(f"   Location: x={x:.2f}, y={y:.2f}")
+                location = result['location']
+                lines.append(f"{i}. Frame {result['frame_id']}")
+                lines.append(f"   Location: x={location['x']:.2f}, y={location['y']:.2f}")
                 
                 # Display matching objects
                 if objects:
                     # Show up to 3 most relevant objects
-                    display_objects = objects[:3]
-                    for obj in display_objects:
-                        print(f"   → {obj}")
+                    lines.extend(f"   → {obj}" for obj in objects[:3])
                     
                     # Indicate if there are more objects
                     if len(objects) > 3:
-                        print(f"   ... and {len(objects) - 3} more")
+                        lines.append(f"   ... and {len(objects) - 3} more")
                 
-                print()  # Empty line between results
+                lines.append("")  # Empty line between results
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
 
     def format_localization_results_from_workflow(self, workflow_result: Dict) -> None:
         """
         Display localization results from workflow in a formatted way for the terminal.
         
+        The output is assembled first and written to stdout in a single call.
+        
         Args:
             workflow_result: Complete workflow result from WorkflowService
         """
-        print("--- Localization Results ---")
+        lines = ["--- Localization Results ---"]
+        localization_results = workflow_result.get('localization_results')
         
         if not workflow_result.get('success', False):
             error_msg = workflow_result.get('error_message', 'Unknown error occurred')
-            print(f"Localization Error: {error_msg}")
-            return
-        
-        localization_results = workflow_result.get('localization_results')
-        if not localization_results:
-            print("Localization Failed: Unable to determine position")
-            return
-        
-        # Display position and orientation
-        position = localization_results.get('position', {})
-        orientation = localization_results.get('orientation', {})
-        
-        x = position.get('x', 0)
-        y = position.get('y', 0)
-        z = position.get('z', 0)
-        roll = orientation.get('roll', 0)
-        pitch = orientation.get('pitch', 0)
-        yaw = orientation.get('yaw', 0)
-        
-        print(f"Position: x={x}, y={y}, z={z}")
-        print(f"Orientation: roll={roll:.2f}, pitch={pitch:.2f}, yaw={yaw:.2f}")
-        
-        # Display detected objects
-        objects = localization_results.get('detected_objects', '')
-        if objects:
-            print(f"Detected Objects: {objects}")
+            lines.append(f"Localization Error: {error_msg}")
+        elif not localization_results:
+            lines.append("Localization Failed: Unable to determine position")
         else:
-            print("Detected Objects: None")
-        
-        # Display picture ID and processing time
-        pic_id = localization_results.get('picture_id')
-        if pic_id is not None:
-            print(f"Picture ID: {pic_id}")
-        
-        # Show processing time
-        processing_time = localization_results.get('processing_time_ms')
-        if processing_time is not None:
-            print(f"Processing Time: {processing_time}ms")
+            # Display position and orientation
+            position = localization_results.get('position') or {}
+            orientation = localization_results.get('orientation') or {}
+            try:
+                x, y, z = _POSITION_FIELDS(position)
+                roll, pitch, yaw = _ORIENTATION_FIELDS(orientation)
+            except KeyError:
+                # Partial result: default missing fields to 0
+                x, y, z = (position.get(key, 0) for key in ("x", "y", "z"))
+                roll, pitch, yaw = (orientation.get(key, 0) for key in ("roll", "pitch", "yaw"))
+            
+            lines.append(
+                f"Position: x={x}, y={y}, z={z}\n"
+                f"Orientation: roll={roll:.2f}, pitch={pitch:.2f}, yaw={yaw:.2f}"
+            )
+            
+            # Display detected objects
+            objects = localization_results.get('detected_objects', '')
+            lines.append(f"Detected Objects: {objects}" if objects else "Detected Objects: None")
+            
+            # Display picture ID and processing time
+            pic_id = localization_results.get('picture_id')
+            if pic_id is not None:
+                lines.append(f"Picture ID: {pic_id}")
+            
+            # Show processing time
+            processing_time = localization_results.get('processing_time_ms')
+            if processing_time is not None:
+                lines.append(f"Processing Time: {processing_time}ms")
+            
+            # Show timing breakdown if available
+            timing_info = workflow_result.get('timing_ms')
+            if timing_info and self.debug:
+                lines.append(f"Search Duration: {timing_info.get('search_duration', 0):.1f}ms")
+                lines.append(f"Localization Duration: {timing_info.get('localization_duration', 0):.1f}ms")
+                lines.append(f"Total Duration: {timing_info.get('total_duration', 0):.1f}ms")
         
-        # Show timing breakdown if available
-        timing_info = workflow_result.get('timing_ms')
-        if timing_info and self.debug:
-            print(f"Search Duration: {timing_info.get('search_duration', 0):.1f}ms")
-            print(f"Localization Duration: {timing_info.get('localization_duration', 0):.1f}ms")
-            print(f"Total Duration: {timing_info.get('total_duration', 0):.1f}ms")
+        sys.stdout.write("\n".join(lines) + "\n")
+    
+    async def close(self) -> None:
+        """
+        Close the HTTP client and its pooled connections, and shut down the RTAB-Map service.
+        """
+        await self._http.aclose()
+        if self.rtabmap_service is not None:
+            await self.rtabmap_service.shutdown()
     
     async def run_integrated_workflow(self, search_term: str) -> bool:
         """
@@ -380,6 +375,8 @@ class RTABMapIntegratedClient:
             logger.error(f"Unexpected error in workflow: {e}")
             print(f"\n=== Workflow Failed ===\nUnexpected error: {e}")
             return False
+        finally:
+            await self.close()
 
 
 def setup_argument_parser() -> argparse.ArgumentParser:
@@ -463,5 +460,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
\ No newline at end of file
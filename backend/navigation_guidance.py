@@ -9,58 +9,262 @@ navigation instructions.
 
 import math
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+import numpy as np
+from typing import Dict, List, Tuple, Optional, Any, Union, NamedTuple
 
 logger = logging.getLogger(__name__)
 
+# A 2D position, either as an {'x', 'y'} dict (API/search results) or an (x, y) pair
+Position = Union[Dict[str, float], Tuple[float, float]]
 
-def calculate_distance(pos1: Dict[str, float], pos2: Dict[str, float]) -> float:
+
+class NavResult(NamedTuple):
+    """Directional guidance from calculate_direction()."""
+    direction: str
+    distance: float
+    bearing: float
+    turn_instruction: str
+
+_PI = math.pi
+_TWO_PI = 2.0 * math.pi
+_RAD_TO_DEG = 180.0 / math.pi  # same factor math.degrees() multiplies by
+
+# Closer than this (meters) the user counts as already at the target
+_AT_LOCATION_DISTANCE = 0.3
+_AT_LOCATION_TEXT = "You are at the target location"
+_ARRIVED_TEXT = "You have arrived at your destination"
+
+# Direction sectors by absolute bearing (degrees), indexed with bisect_left
+_DIRECTION_BOUNDS = (22.5, 67.5, 112.5, 157.5)
+_DIRECTIONS_RIGHT = ("straight ahead", "ahead and to your right", "on your right",
+                     "behind you on the right", "directly behind you")
+_DIRECTIONS_LEFT = ("straight ahead", "ahead and to your left", "on your left",
+                    "behind you on the left", "directly behind you")
+
+# Turn buckets by absolute bearing (degrees), indexed with bisect_right
+_TURN_BOUNDS = (15, 45, 90, 135)
+_TURNS_RIGHT = ("Keep going straight", "Turn slightly to your right", "Make a right turn",
+                "Turn sharply to your right", "Turn around")
+_TURNS_LEFT = ("Keep going straight", "Turn slightly to your left", "Make a left turn",
+               "Turn sharply to your left", "Turn around")
+
+
+def _as_xy(position: Position) -> Tuple[float, float]:
+    """Return a position as an (x, y) tuple, unpacking {'x', 'y'} dicts once at the boundary."""
+    if isinstance(position, dict):
+        return position['x'], position['y']
+    return position[0], position[1]
+
+
+def calculate_distance(pos1: Position, pos2: Position) -> float:
     """
     Calculate Euclidean distance between two 2D positions.
     
     Args:
-        pos1: Dictionary with 'x' and 'y' keys
-        pos2: Dictionary with 'x' and 'y' keys
+        pos1: Dictionary with 'x' and 'y' keys, or an (x, y) tuple
+        pos2: Dictionary with 'x' and 'y' keys, or an (x, y) tuple
         
     Returns:
         Distance in meters (or whatever unit the coordinates use)
     """
-    dx = pos2['x'] - pos1['x']
-    dy = pos2['y'] - pos1['y']
-    return math.sqrt(dx**2 + dy**2)
+    x1, y1 = _as_xy(pos1)
+    x2, y2 = _as_xy(pos2)
+    return math.hypot(x2 - x1, y2 - y1)
+
+
+def locations_array(frames: List[Dict], dtype: Any = np.float64) -> np.ndarray:
+    """
+    Collect the 'location' x/y of each frame into an (N, 2) array.
+    
+    Args:
+        frames: List of search result dictionaries with 'location' key
+        dtype: Element type; np.float32 halves the memory moved by the batch
+            kernels on large frame sets (coordinates are only cm-accurate)
+        
+    Returns:
+        Array whose rows are (x, y) in the same order as frames
+    """
+    return np.fromiter(
+        ((frame['location']['x'], frame['location']['y']) for frame in frames),
+        dtype=np.dtype((dtype, 2)),
+        count=len(frames)
+    )
+
+
+def calculate_directions_batch(user_pos: Position,
+                               locations_xy: np.ndarray,
+                               user_yaw: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized distance and relative bearing from the user to many targets.
+    
+    Array counterpart of _nav_core(), with the same Y-axis inversion. Works in the
+    dtype of locations_xy, so float32 input stays float32 throughout.
+    
+    Args:
+        user_pos: Dict with 'x', 'y' keys or (x, y) tuple (user's position)
+        locations_xy: (N, 2) array of target (x, y) positions, e.g. from locations_array()
+        user_yaw: User's orientation in radians (from localization)
+        
+    Returns:
+        Tuple of (distances, relative_bearings_deg) arrays of length N
+    """
+    ux, uy = _as_xy(user_pos)
+    dx = np.subtract(locations_xy[:, 0], ux)
+    dy = np.subtract(uy, locations_xy[:, 1])  # Y-axis inversion: -(ty - uy)
+    distances = np.hypot(dx, dy)
+    
+    # Relative bearing = atan2(dy, dx) - (-yaw), normalized to [-pi, pi).
+    # Updated in place so the whole pass allocates only the two output arrays and dx/dy.
+    bearings = np.arctan2(dy, dx)
+    bearings += user_yaw + _PI
+    np.mod(bearings, _TWO_PI, out=bearings)
+    bearings -= _PI
+    np.degrees(bearings, out=bearings)
+    
+    return distances, bearings
+
+
+def batch_nearest(user_positions: np.ndarray,
+                  frame_positions: np.ndarray,
+                  user_yaws: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Distance and relative bearing from each of M users to each of N frames.
+    
+    Broadcasting counterpart of calculate_directions_batch() (same Y-axis
+    inversion), e.g. for multi-user or debug views.
+    
+    Args:
+        user_positions: (M, 2) array of user (x, y) positions
+        frame_positions: (N, 2) array of frame (x, y) positions, e.g. from locations_array()
+        user_yaws: (M,) array of user orientations in radians
+        
+    Returns:
+        Tuple of (nearest_idx, distances, bearings_deg): the (M,) index of each user's
+        nearest frame, and (M, N) arrays of distances and relative bearings in degrees
+    """
+    user_positions = np.asarray(user_positions)
+    frame_positions = np.asarray(frame_positions)
+    
+    dx = np.subtract(frame_positions[None, :, 0], user_positions[:, 0, None])
+    dy = np.subtract(user_positions[:, 1, None], frame_positions[None, :, 1])  # Y-axis inversion
+    distances = np.hypot(dx, dy)
+    
+    # Same in-place normalization as calculate_directions_batch, one yaw per row
+    bearings = np.arctan2(dy, dx)
+    bearings += (np.asarray(user_yaws) + _PI)[:, None]
+    np.mod(bearings, _TWO_PI, out=bearings)
+    bearings -= _PI
+    np.degrees(bearings, out=bearings)
+    
+    return np.argmin(distances, axis=1), distances, bearings
+
 
+# Array forms of the direction sector tables for direction_texts(); row 0 is the left
+# side (bearing <= 0), row 1 the right side
+_DIRECTION_BOUNDS_ARRAY = np.array(_DIRECTION_BOUNDS)
+_DIRECTION_LABELS = np.array([_DIRECTIONS_LEFT, _DIRECTIONS_RIGHT])
 
-def select_nearest_frame(user_position: Dict[str, float], 
-                        search_results: List[Dict]) -> Tuple[Dict, List[Dict]]:
+
+def direction_texts(bearings_deg: np.ndarray) -> np.ndarray:
+    """
+    Vectorized direction labels for many relative bearings at once.
+    
+    Array counterpart of the sector lookup in generate_direction_text(), with the
+    same boundary handling, e.g. for the bearings from calculate_directions_batch().
+    
+    Args:
+        bearings_deg: (N,) array of relative bearings in degrees
+        
+    Returns:
+        (N,) array of direction labels (e.g. "ahead and to your left")
+    """
+    bearings_deg = np.asarray(bearings_deg, dtype=np.float64)
+    sectors = np.searchsorted(_DIRECTION_BOUNDS_ARRAY, np.abs(bearings_deg), side="left")
+    return _DIRECTION_LABELS[(bearings_deg > 0).view(np.int8), sectors]
+
+
+def select_nearest_frame(user_position: Position, 
+                        search_results: List[Dict]) -> Tuple[Dict, List[Dict], List[float]]:
     """
     Select the nearest frame from search results based on user position.
     
+    The search result dicts are not copied or modified; distances are returned
+    as a parallel list instead.
+    
     Args:
-        user_position: Dict with 'x', 'y' keys (user's current position)
+        user_position: Dict with 'x', 'y' keys or (x, y) tuple (user's current position)
         search_results: List of search result dictionaries with 'location' key
         
     Returns:
-        Tuple of (nearest_frame, all_frames_with_distances)
+        Tuple of (nearest_frame, frames sorted by distance, their distances)
+    """
+    # A single match needs no sorting or array setup
+    if len(search_results) == 1:
+        frame = search_results[0]
+        return frame, [frame], [calculate_distance(user_position, frame['location'])]
+    
+    # Gather frame coordinates into x/y columns and compute all distances at once;
+    # np.hypot writes into dx, so no squared temporaries are allocated. Kept in float64:
+    # these distances pick the target frame and are shown to the user.
+    locations_xy = locations_array(search_results)
+    ux, uy = _as_xy(user_position)
+    dx = np.subtract(locations_xy[:, 0], ux)
+    dy = np.subtract(locations_xy[:, 1], uy)
+    all_distances = np.hypot(dx, dy, out=dx)
+    
+    # Stable sort, so equidistant frames keep their search order
+    order = np.argsort(all_distances, kind="stable")
+    distances = all_distances[order].tolist()
+    sorted_frames = [search_results[index] for index in order.tolist()]
+    
+    nearest_frame = sorted_frames[0]
+    
+    return nearest_frame, sorted_frames, distances
+
+
+def _nav_core(ux: float, uy: float, tx: float, ty: float, yaw: float,
+              distance: Optional[float] = None, *,
+              _hypot=math.hypot, _atan2=math.atan2,
+              _pi=_PI, _two_pi=_TWO_PI, _rad_to_deg=_RAD_TO_DEG) -> Tuple[float, float]:
     """
-    frames_with_distances = []
+    Pure-math core of calculate_direction.
     
-    for frame in search_results:
-        distance = calculate_distance(user_position, frame['location'])
-        frame_with_distance = frame.copy()
-        frame_with_distance['distance_from_user'] = distance
-        frames_with_distances.append(frame_with_distance)
+    Returns (distance, relative_bearing_deg) from the user at (ux, uy) with
+    orientation yaw (radians) to the target at (tx, ty), applying the RTAB-Map
+    Y-axis inversion described in calculate_direction(). A distance the caller
+    already knows is passed through instead of being recomputed.
     
-    # Sort by distance
-    frames_with_distances.sort(key=lambda f: f['distance_from_user'])
+    The keyword-only underscore arguments bind the math functions and constants
+    at definition time, so the arithmetic does no global/attribute lookups.
+    """
+    # Calculate vector from user to target
+    dx = tx - ux
+    dy = ty - uy
+    if distance is None:
+        distance = _hypot(dx, dy)
     
-    nearest_frame = frames_with_distances[0]
+    # Y-AXIS INVERSION RE-ENABLED - RTAB-Map coordinate system correction
+    # RTAB-Map: Moving forward/east → Y becomes MORE NEGATIVE
+    # Navigation expects: Moving forward → Positive Y
+    # Solution: Negate dy AND yaw before bearing calculation
+    dy = -dy
+    corrected_yaw = -yaw
+    
+    # Relative bearing = absolute bearing (angle from positive x-axis) - user's orientation
+    relative_bearing_rad = _atan2(dy, dx) - corrected_yaw
     
-    return nearest_frame, frames_with_distances
+    # Normalize to [-pi, pi) in one step, however far yaw has wrapped
+    relative_bearing_rad = (relative_bearing_rad + _pi) % _two_pi - _pi
+    
+    return distance, relative_bearing_rad * _rad_to_deg
 
 
-def calculate_direction(user_pos: Dict[str, float], 
-                       target_pos: Dict[str, float],
-                       user_yaw: float) -> Dict[str, Any]:
+def calculate_direction(user_pos: Position, 
+                       target_pos: Position,
+                       user_yaw: float,
+                       distance: Optional[float] = None) -> NavResult:
     """
     Calculate directional guidance from user position to target.
     
@@ -75,80 +279,54 @@ def calculate_direction(user_pos: Dict[str, float],
     RTAB-Map coordinate system is consistent between databases.
     
     Args:
-        user_pos: Dict with 'x', 'y' keys (user's position)
-        target_pos: Dict with 'x', 'y' keys (target position)
+        user_pos: Dict with 'x', 'y' keys or (x, y) tuple (user's position)
+        target_pos: Dict with 'x', 'y' keys or (x, y) tuple (target position)
         user_yaw: User's orientation in radians (from localization)
+        distance: Distance to the target if already known (e.g. from
+            select_nearest_frame()); computed here when omitted
         
     Returns:
-        Dict with:
+        NavResult with:
         - direction: String description (e.g., "ahead and to your left")
         - distance: Float distance in meters
         - bearing: Angle in degrees
         - turn_instruction: String (e.g., "Turn 30° left")
     """
-    logger.info("="*80)
-    logger.info("NAVIGATION CALCULATION DETAILS")
-    logger.info("="*80)
-    
-    # Calculate vector from user to target
-    dx = target_pos['x'] - user_pos['x']
-    dy = target_pos['y'] - user_pos['y']
-    
-    # Y-AXIS INVERSION RE-ENABLED - RTAB-Map coordinate system correction
-    # RTAB-Map: Moving forward/east → Y becomes MORE NEGATIVE
-    # Navigation expects: Moving forward → Positive Y
-    # Solution: Negate dy AND yaw before bearing calculation
-    dy = -dy  # RE-ENABLED - required for correct RTAB-Map coordinate transformation
-    corrected_yaw = -user_yaw  # RE-ENABLED - required for correct RTAB-Map coordinate transformation
-    
-    logger.info(f"User Position: x={user_pos['x']:.2f}, y={user_pos['y']:.2f}")
-    logger.info(f"Target Position: x={target_pos['x']:.2f}, y={target_pos['y']:.2f}")
-    logger.info(f"Vector Components: dx={dx:.2f}, dy={dy:.2f} (Y-axis inversion: ENABLED)")
-    logger.info(f"User Yaw (orientation): {user_yaw:.4f} radians = {math.degrees(user_yaw):.1f}°")
-    logger.info(f"Corrected Yaw: {corrected_yaw:.4f} radians = {math.degrees(corrected_yaw):.1f}° (Y-axis inverted)")
-    
-    # Calculate absolute bearing (angle from positive x-axis)
-    target_bearing_rad = math.atan2(dy, dx)
-    target_bearing_deg = math.degrees(target_bearing_rad)
-    
-    logger.info(f"Absolute Target Bearing: {target_bearing_rad:.4f} radians = {target_bearing_deg:.1f}° (Y-axis inverted)")
-    
-    # Calculate relative bearing (relative to user's current orientation)
-    # Use corrected_yaw (which IS inverted for RTAB-Map coordinate system)
-    relative_bearing_rad = target_bearing_rad - corrected_yaw
-    
-    logger.info(f"Relative Bearing (before normalization): {relative_bearing_rad:.4f} radians = {math.degrees(relative_bearing_rad):.1f}° (with Y-axis inversion)")
-    
-    # Normalize to [-pi, pi]
-    while relative_bearing_rad > math.pi:
-        relative_bearing_rad -= 2 * math.pi
-    while relative_bearing_rad < -math.pi:
-        relative_bearing_rad += 2 * math.pi
-    
-    # Convert to degrees
-    relative_bearing_deg = math.degrees(relative_bearing_rad)
-    
-    logger.info(f"Relative Bearing (after normalization): {relative_bearing_rad:.4f} radians = {relative_bearing_deg:.1f}°")
-    
-    # Calculate distance
-    distance = calculate_distance(user_pos, target_pos)
-    
-    logger.info(f"Distance to Target: {distance:.2f} meters")
-    
-    # Generate human-readable direction
-    direction_text = generate_direction_text(relative_bearing_deg, distance)
-    turn_instruction = generate_turn_instruction(relative_bearing_deg, distance)
-    
-    logger.info(f"Generated Direction: {direction_text}")
-    logger.info(f"Turn Instruction: {turn_instruction}")
-    logger.info("="*80)
-    
-    return {
-        'direction': direction_text,
-        'distance': round(distance, 2),
-        'bearing': round(relative_bearing_deg, 1),
-        'turn_instruction': turn_instruction
-    }
+    ux, uy = _as_xy(user_pos)
+    tx, ty = _as_xy(target_pos)
+    distance, relative_bearing_deg = _nav_core(ux, uy, tx, ty, user_yaw, distance)
+    
+    # Generate human-readable direction; once the user is at the target both texts are
+    # fixed, so the bearing-based generators are skipped. The bearing itself is still
+    # returned (it also drives the clock position).
+    if distance < _AT_LOCATION_DISTANCE:
+        direction_text = _AT_LOCATION_TEXT
+        turn_instruction = _ARRIVED_TEXT
+    else:
+        direction_text = generate_direction_text(relative_bearing_deg, distance)
+        turn_instruction = generate_turn_instruction(relative_bearing_deg, distance)
+    
+    # Only build the detailed log lines when INFO logging is enabled
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("="*80)
+        logger.info("NAVIGATION CALCULATION DETAILS")
+        logger.info("="*80)
+        logger.info("User Position: x=%.2f, y=%.2f", ux, uy)
+        logger.info("Target Position: x=%.2f, y=%.2f", tx, ty)
+        logger.info("User Yaw (orientation): %.4f radians = %.1f° (Y-axis inversion: ENABLED)",
+                    user_yaw, user_yaw * _RAD_TO_DEG)
+        logger.info("Relative Bearing: %.1f°", relative_bearing_deg)
+        logger.info("Distance to Target: %.2f meters", distance)
+        logger.info("Generated Direction: %s", direction_text)
+        logger.info("Turn Instruction: %s", turn_instruction)
+        logger.info("="*80)
+    
+    return NavResult(
+        direction=direction_text,
+        distance=round(distance, 2),
+        bearing=round(relative_bearing_deg, 1),
+        turn_instruction=turn_instruction
+    )
 
 
 def generate_direction_text(bearing_deg: float, distance: float) -> str:
@@ -158,49 +336,51 @@ def generate_direction_text(bearing_deg: float, distance: float) -> str:
     """
     
     # Special case: Already at the location
-    if distance < 0.3:
-        return "You are at the target location"
-    
-    # Determine direction (8-point compass)
-    if -22.5 <= bearing_deg <= 22.5:
-        direction = "straight ahead"
-    elif 22.5 < bearing_deg <= 67.5:
-        direction = "ahead and to your right"
-    elif 67.5 < bearing_deg <= 112.5:
-        direction = "on your right"
-    elif 112.5 < bearing_deg <= 157.5:
-        direction = "behind you on the right"
-    elif bearing_deg > 157.5 or bearing_deg < -157.5:
-        direction = "directly behind you"
-    elif -157.5 <= bearing_deg < -112.5:
-        direction = "behind you on the left"
-    elif -112.5 <= bearing_deg < -67.5:
-        direction = "on your left"
-    elif -67.5 <= bearing_deg < -22.5:
-        direction = "ahead and to your left"
-    
-    # Generate natural distance descriptions
+    if distance < _AT_LOCATION_DISTANCE:
+        return _AT_LOCATION_TEXT
+    
+    # Determine direction (8-point compass): bucket the absolute bearing, then pick the side
+    # (a bearing exactly on a boundary belongs to the sector closer to straight ahead)
+    sector = bisect_left(_DIRECTION_BOUNDS, abs(bearing_deg))
+    direction = (_DIRECTIONS_RIGHT if bearing_deg > 0 else _DIRECTIONS_LEFT)[sector]
+    
+    # Generate natural distance descriptions. The sentence only depends on the direction
+    # and the rounded distance, so it is built once per combination and then reused.
     if distance < 1.0:
         # Close - use simple integer
         distance_int = round(distance)
         if distance_int == 0:
             distance_int = 1  # Avoid saying "zero meters"
-        return f"About {distance_int} meter {direction}"
+        return _direction_sentence(direction, 0, distance_int)
     
     elif distance < 3.0:
         # Medium distance - round to nearest 0.5
-        distance_rounded = round(distance * 2) / 2
-        return f"{direction.capitalize()}, about {distance_rounded} meters"
+        return _direction_sentence(direction, 1, round(distance * 2) / 2)
     
     elif distance < 10.0:
         # Longer distance - round to integer
-        distance_int = round(distance)
-        return f"{direction.capitalize()}, roughly {distance_int} meters"
+        return _direction_sentence(direction, 2, round(distance))
     
     else:
         # Very far - round to nearest 5 meters
-        distance_rounded = round(distance / 5) * 5
-        return f"{direction.capitalize()}, approximately {distance_rounded} meters away"
+        return _direction_sentence(direction, 3, round(distance / 5) * 5)
+
+
+# Sentence templates for generate_direction_text, by distance tier
+_DIRECTION_TEMPLATES = (
+    "About {amount} meter {direction}",
+    "{Direction}, about {amount} meters",
+    "{Direction}, roughly {amount} meters",
+    "{Direction}, approximately {amount} meters away",
+)
+
+
+@lru_cache(maxsize=512, typed=True)
+def _direction_sentence(direction: str, tier: int, amount: float) -> str:
+    """Render (and memoize) a direction sentence from already-rounded inputs."""
+    return _DIRECTION_TEMPLATES[tier].format(
+        direction=direction, Direction=direction.capitalize(), amount=amount
+    )
 
 
 def generate_turn_instruction(bearing_deg: float, distance: float = None) -> str:
@@ -212,39 +392,13 @@ def generate_turn_instruction(bearing_deg: float, distance: float = None) -> str
     This function is kept for backward compatibility.
     """
     # Special case: Already at location
-    if distance is not None and distance < 0.3:
-        return "You have arrived at your destination"
-    
-    abs_bearing = abs(bearing_deg)
-    
-    # Very small angle - essentially straight
-    if abs_bearing < 15:
-        return "Keep going straight"
-    
-    # Slight turn (15-45 degrees)
-    elif abs_bearing < 45:
-        if bearing_deg > 0:
-            return "Turn slightly to your right"
-        else:
-            return "Turn slightly to your left"
-    
-    # Moderate turn (45-90 degrees)
-    elif abs_bearing < 90:
-        if bearing_deg > 0:
-            return "Make a right turn"
-        else:
-            return "Make a left turn"
-    
-    # Sharp turn (90-135 degrees)
-    elif abs_bearing < 135:
-        if bearing_deg > 0:
-            return "Turn sharply to your right"
-        else:
-            return "Turn sharply to your left"
-    
-    # U-turn or nearly behind (135-180 degrees)
-    else:
-        return "Turn around"
+    if distance is not None and distance < _AT_LOCATION_DISTANCE:
+        return _ARRIVED_TEXT
+    
+    # Bucket the absolute bearing: straight (<15°), slight (15-45°), moderate (45-90°),
+    # sharp (90-135°) or U-turn (135-180°), then pick the side
+    bucket = bisect_right(_TURN_BOUNDS, abs(bearing_deg))
+    return (_TURNS_RIGHT if bearing_deg > 0 else _TURNS_LEFT)[bucket]
 
 
 def format_distance(distance: float) -> str:
@@ -283,6 +437,27 @@ def format_distance(distance: float) -> str:
         return f"approximately {rounded} meters"
 
 
+# Clock position for each 30° offset from straight ahead, indexed by offset % 12
+_CLOCK_FROM_HOUR = (12, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11)
+
+# Orientation phrase for each clock position (index 1-12), used by generate_clock_instruction
+_CLOCK_ORIENTATIONS = (
+    None,
+    "Turn slightly right to face 1 o'clock",
+    "Turn right to face 2 o'clock",
+    "Turn to face 3 o'clock, directly to your right",
+    "Turn right to face 4 o'clock",
+    "Turn around to your right, facing 5 o'clock",
+    "Turn around to face 6 o'clock, behind you",
+    "Turn around to your left, facing 7 o'clock",
+    "Turn left to face 8 o'clock",
+    "Turn to face 9 o'clock, directly to your left",
+    "Turn left to face 10 o'clock",
+    "Turn slightly left to face 11 o'clock",
+    "Face straight ahead at 12 o'clock",
+)
+
+
 def generate_clock_instruction(clock_position: int, bearing: float, distance: float) -> str:
     """
     Generate natural language instruction using clock-face directions.
@@ -301,34 +476,12 @@ def generate_clock_instruction(clock_position: int, bearing: float, distance: fl
         (1, 30, 18.5) → "Turn slightly right to face 1 o'clock. Then walk approximately 20 meters."
     """
     # Special case: Already at destination
-    if distance < 0.3:
-        return "You have arrived at your destination"
+    if distance < _AT_LOCATION_DISTANCE:
+        return _ARRIVED_TEXT
     
     # Generate orientation instruction based on clock position
-    if clock_position == 12:
-        orientation = "Face straight ahead at 12 o'clock"
-    elif clock_position == 3:
-        orientation = "Turn to face 3 o'clock, directly to your right"
-    elif clock_position == 9:
-        orientation = "Turn to face 9 o'clock, directly to your left"
-    elif clock_position == 6:
-        orientation = "Turn around to face 6 o'clock, behind you"
-    elif clock_position == 1:
-        orientation = "Turn slightly right to face 1 o'clock"
-    elif clock_position == 2:
-        orientation = "Turn right to face 2 o'clock"
-    elif clock_position == 4:
-        orientation = "Turn right to face 4 o'clock"
-    elif clock_position == 5:
-        orientation = "Turn around to your right, facing 5 o'clock"
-    elif clock_position == 11:
-        orientation = "Turn slightly left to face 11 o'clock"
-    elif clock_position == 10:
-        orientation = "Turn left to face 10 o'clock"
-    elif clock_position == 8:
-        orientation = "Turn left to face 8 o'clock"
-    elif clock_position == 7:
-        orientation = "Turn around to your left, facing 7 o'clock"
+    if 1 <= clock_position <= 12:
+        orientation = _CLOCK_ORIENTATIONS[clock_position]
     else:
         # Fallback (should not happen with valid clock positions)
         orientation = f"Turn to face {clock_position} o'clock"
@@ -339,9 +492,10 @@ def generate_clock_instruction(clock_position: int, bearing: float, distance: fl
     return f"{orientation}. Then walk {distance_text}."
 
 
-def generate_clock_face_direction(user_pos: Dict[str, float], 
-                                  target_pos: Dict[str, float], 
-                                  user_yaw: float) -> Dict[str, Any]:
+def generate_clock_face_direction(user_pos: Position, 
+                                  target_pos: Position, 
+                                  user_yaw: float,
+                                  distance: Optional[float] = None) -> Dict[str, Any]:
     """
     Generate clock-face navigation guidance from user position to target.
     
@@ -352,9 +506,10 @@ def generate_clock_face_direction(user_pos: Dict[str, float],
     - 9 o'clock = directly to the left
     
     Args:
-        user_pos: Dict with 'x', 'y' keys (user's position in meters)
-        target_pos: Dict with 'x', 'y' keys (target position in meters)
+        user_pos: Dict with 'x', 'y' keys or (x, y) tuple (user's position in meters)
+        target_pos: Dict with 'x', 'y' keys or (x, y) tuple (target position in meters)
         user_yaw: User's orientation in radians (from localization)
+        distance: Distance to the target if already known; passed to calculate_direction()
         
     Returns:
         Dict with:
@@ -369,14 +524,19 @@ def generate_clock_face_direction(user_pos: Dict[str, float],
            "distance_meters": 18.78, 
            "instruction": "Turn slightly right to face 1 o'clock. Then walk around 19 meters."}
     """
-    # Use existing calculate_direction function (handles Y-axis inversion)
-    direction_data = calculate_direction(user_pos, target_pos, user_yaw)
-    
-    bearing = direction_data['bearing']  # Degrees, range [-180, +180]
-    distance = direction_data['distance']  # Meters
-    
-    logger.info(f"Clock-face calculation: bearing={bearing:.1f}°, distance={distance:.2f}m")
-    
+    # Shared bearing/distance core of calculate_direction (handles Y-axis inversion);
+    # the direction texts are not needed here
+    ux, uy = _as_xy(user_pos)
+    tx, ty = _as_xy(target_pos)
+    distance, bearing = _nav_core(ux, uy, tx, ty, user_yaw, distance)
+    return _clock_face_guidance(round(bearing, 1), round(distance, 2))
+
+
+def _clock_face_guidance(bearing: float, distance: float) -> Dict[str, Any]:
+    """
+    Build the generate_clock_face_direction() result from a bearing (degrees, range
+    [-180, +180]) and distance (meters), rounded as in calculate_direction().
+    """
     # Convert bearing to clock position
     # Each clock hour = 30 degrees (360° / 12 hours)
     # 0° = 12 o'clock (straight ahead)
@@ -386,31 +546,17 @@ def generate_clock_face_direction(user_pos: Dict[str, float],
     # Round to nearest 30° to get clock hour offset
     clock_hour = round(bearing / 30.0)
     
-    logger.info(f"Initial clock_hour calculation: {clock_hour}")
-    
-    # Handle edge cases near ±180° (should map to 6 o'clock)
-    if clock_hour > 6:
-        clock_hour = clock_hour - 12
-    elif clock_hour < -6:
-        clock_hour = clock_hour + 12
-    
-    logger.info(f"After edge case handling: clock_hour={clock_hour}")
-    
-    # Convert clock_hour offset to actual clock position (1-12)
-    if clock_hour == 0:
-        clock_position = 12
-    elif clock_hour > 0:
-        clock_position = clock_hour
-    else:
-        # Negative hours: convert to clock positions 7-11
-        clock_position = 12 + clock_hour
-    
-    logger.info(f"Final clock_position: {clock_position}")
+    # Wrap the offset onto the clock face: 0 → 12, negative offsets → 7-11, and
+    # both ±6 (near ±180°) → 6 o'clock
+    clock_position = _CLOCK_FROM_HOUR[clock_hour % 12]
     
     # Generate natural language instruction
     instruction = generate_clock_instruction(clock_position, bearing, distance)
     
-    logger.info(f"Generated instruction: {instruction}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Clock-face calculation: bearing=%.1f°, distance=%.2fm", bearing, distance)
+        logger.info("Clock hour offset: %s, clock_position: %s", clock_hour, clock_position)
+        logger.info("Generated instruction: %s", instruction)
     
     return {
         'clock_position': clock_position,
@@ -421,7 +567,7 @@ def generate_clock_face_direction(user_pos: Dict[str, float],
 
 
 def add_navigation_guidance(search_results: List[Dict], 
-                           user_position: Dict[str, float],
+                           user_position: Position,
                            user_yaw: float,
                            object_name: str) -> Dict[str, Any]:
     """
@@ -436,7 +582,8 @@ def add_navigation_guidance(search_results: List[Dict],
     Returns:
         Dictionary containing:
         - nearest_frame: The closest frame to navigate to
-        - all_frames_with_distances: All frames with distance information
+        - all_frames_with_distances: All frames, sorted by distance
+        - distances: Distance to each frame in all_frames_with_distances (meters)
         - navigation_guidance: Directional guidance to nearest frame
         - multiple_frames_message: Message to display if multiple frames found
     """
@@ -444,37 +591,45 @@ def add_navigation_guidance(search_results: List[Dict],
         return {
             'nearest_frame': None,
             'all_frames_with_distances': [],
+            'distances': [],
             'navigation_guidance': None,
             'multiple_frames_message': None
         }
     
-    logger.info(f"Starting navigation guidance calculation for '{object_name}'")
-    logger.info(f"User position: {user_position}, User yaw: {user_yaw:.4f} rad")
-    logger.info(f"Number of search results: {len(search_results)}")
+    log_info = logger.isEnabledFor(logging.INFO)
+    if log_info:
+        logger.info("Starting navigation guidance calculation for '%s'", object_name)
+        logger.info("User position: %s, User yaw: %.4f rad", user_position, user_yaw)
+        logger.info("Number of search results: %d", len(search_results))
+    
+    # Unpack the user's position once; everything below works on (x, y) tuples
+    user_xy = _as_xy(user_position)
     
     # Calculate distances and select nearest frame
-    nearest_frame, all_frames = select_nearest_frame(user_position, search_results)
+    nearest_frame, all_frames, distances = select_nearest_frame(user_xy, search_results)
     
-    logger.info(f"Nearest frame selected: Frame {nearest_frame['frame_id']} at location {nearest_frame['location']}")
+    if log_info:
+        logger.info("Nearest frame selected: Frame %s at location %s",
+                    nearest_frame['frame_id'], nearest_frame['location'])
     
     # Generate multiple frames message if applicable
     multiple_frames_message = None
     if len(search_results) > 1:
         multiple_frames_message = "⚠️  The object exists in several frames. I will guide you to the nearest frame."
     
-    # Calculate navigation guidance to nearest frame using CLOCK-FACE system
-    clock_guidance = generate_clock_face_direction(
-        user_pos=user_position,
-        target_pos=nearest_frame['location'],
-        user_yaw=user_yaw
-    )
+    # The nearest frame's distance is already known from select_nearest_frame
+    nearest_distance = distances[0]
+    target_xy = _as_xy(nearest_frame['location'])
     
-    # Also calculate traditional navigation for backward compatibility
+    # Calculate direction guidance once: it provides the traditional fields (backward
+    # compatibility) and the input for the CLOCK-FACE system
     traditional_guidance = calculate_direction(
-        user_pos=user_position,
-        target_pos=nearest_frame['location'],
-        user_yaw=user_yaw
+        user_pos=user_xy,
+        target_pos=target_xy,
+        user_yaw=user_yaw,
+        distance=nearest_distance
     )
+    clock_guidance = _clock_face_guidance(traditional_guidance.bearing, traditional_guidance.distance)
     
     # Merge both guidance systems
     navigation_guidance = {
@@ -483,34 +638,36 @@ def add_navigation_guidance(search_results: List[Dict],
         'clock_instruction': clock_guidance['instruction'],
         
         # Traditional guidance (backward compatibility)
-        'direction': traditional_guidance['direction'],
-        'turn_instruction': traditional_guidance['turn_instruction'],
+        'direction': traditional_guidance.direction,
+        'turn_instruction': traditional_guidance.turn_instruction,
         
         # Common fields
         'target_object': object_name,
         'target_frame_id': nearest_frame['frame_id'],
         'distance': clock_guidance['distance_meters'],
         'bearing': clock_guidance['bearing_degrees'],
-        'is_at_location': clock_guidance['distance_meters'] < 0.3
+        'is_at_location': clock_guidance['distance_meters'] < _AT_LOCATION_DISTANCE
     }
     
-    logger.info("="*80)
-    logger.info("FINAL NAVIGATION GUIDANCE (CLOCK-FACE SYSTEM)")
-    logger.info("="*80)
-    logger.info(f"Target Object: {navigation_guidance['target_object']}")
-    logger.info(f"Target Frame ID: {navigation_guidance['target_frame_id']}")
-    logger.info(f"Clock Position: {navigation_guidance['clock_position']} o'clock")
-    logger.info(f"Clock Instruction: {navigation_guidance['clock_instruction']}")
-    logger.info(f"Distance: {navigation_guidance['distance']} meters")
-    logger.info(f"Bearing: {navigation_guidance['bearing']}°")
-    logger.info(f"At Location: {navigation_guidance['is_at_location']}")
-    logger.info(f"Legacy Direction: {navigation_guidance['direction']}")
-    logger.info(f"Legacy Turn: {navigation_guidance['turn_instruction']}")
-    logger.info("="*80)
+    if log_info:
+        logger.info("="*80)
+        logger.info("FINAL NAVIGATION GUIDANCE (CLOCK-FACE SYSTEM)")
+        logger.info("="*80)
+        logger.info("Target Object: %s", navigation_guidance['target_object'])
+        logger.info("Target Frame ID: %s", navigation_guidance['target_frame_id'])
+        logger.info("Clock Position: %s o'clock", navigation_guidance['clock_position'])
+        logger.info("Clock Instruction: %s", navigation_guidance['clock_instruction'])
+        logger.info("Distance: %s meters", navigation_guidance['distance'])
+        logger.info("Bearing: %s°", navigation_guidance['bearing'])
+        logger.info("At Location: %s", navigation_guidance['is_at_location'])
+        logger.info("Legacy Direction: %s", navigation_guidance['direction'])
+        logger.info("Legacy Turn: %s", navigation_guidance['turn_instruction'])
+        logger.info("="*80)
     
     return {
         'nearest_frame': nearest_frame,
         'all_frames_with_distances': all_frames,
+        'distances': distances,
         'navigation_guidance': navigation_guidance,
         'multiple_frames_message': multiple_frames_message
     }
@@ -531,55 +688,59 @@ def format_navigation_display(navigation_data: Dict[str, Any]) -> str:
     
     nav = navigation_data['navigation_guidance']
     
-    output = "\n--- Navigation Guidance ---\n"
-    output += f"📍 Direction: {nav['direction']}\n"
-    output += f"🧭 Turn Instruction: {nav['turn_instruction']}\n"
-    output += f"📏 Distance: {nav['distance']} meters\n"
+    parts = [
+        "\n--- Navigation Guidance ---\n",
+        f"📍 Direction: {nav['direction']}\n",
+        f"🧭 Turn Instruction: {nav['turn_instruction']}\n",
+        f"📏 Distance: {nav['distance']} meters\n",
+    ]
     
     if nav['is_at_location']:
-        output += "\nYou are already at the object location!\n"
+        parts.append("\nYou are already at the object location!\n")
     
-    return output
+    return "".join(parts)
 
 
 def format_search_results_with_distances(all_frames: List[Dict], 
+                                        distances: List[float],
                                         nearest_frame: Dict,
                                         multiple_frames_message: Optional[str] = None) -> str:
     """
     Format search results with distance information for CLI display.
     
     Args:
-        all_frames: All frames with distance information
+        all_frames: All frames, sorted by distance
+        distances: Distance to each frame in all_frames (meters)
         nearest_frame: The nearest frame (for highlighting)
         multiple_frames_message: Message to show if multiple frames exist
         
     Returns:
         Formatted string for terminal display
     """
-    output = "--- Search Results ---\n"
-    output += f"Found {len(all_frames)} matches:\n\n"
+    parts = ["--- Search Results ---\n", f"Found {len(all_frames)} matches:\n\n"]
+    append = parts.append
     
     if multiple_frames_message:
-        output += f"{multiple_frames_message}\n\n"
+        append(f"{multiple_frames_message}\n\n")
     
-    for i, frame in enumerate(all_frames, 1):
-        nearest_marker = " ⭐ NEAREST FRAME" if frame == nearest_frame else ""
-        distance_text = f" ({frame['distance_from_user']:.2f}m away)"
+    for i, (frame, distance) in enumerate(zip(all_frames, distances), 1):
+        nearest_marker = " ⭐ NEAREST FRAME" if frame is nearest_frame else ""
+        location = frame['location']
         
-        output += f"{i}. Frame {frame['frame_id']}{nearest_marker}{distance_text}\n"
-        output += f"   Location: x={frame['location']['x']:.2f}, y={frame['location']['y']:.2f}\n"
+        append(f"{i}. Frame {frame['frame_id']}{nearest_marker} ({distance:.2f}m away)\n")
+        append(f"   Location: x={location['x']:.2f}, y={location['y']:.2f}\n")
         
         # Display matching objects
-        if frame.get('objects'):
+        objects = frame.get('objects')
+        if objects:
             # Show up to 3 most relevant objects
-            display_objects = frame['objects'][:3]
-            for obj in display_objects:
-                output += f"   → {obj}\n"
+            for obj in objects[:3]:
+                append(f"   → {obj}\n")
             
             # Indicate if there are more objects
-            if len(frame['objects']) > 3:
-                output += f"   ... and {len(frame['objects']) - 3} more\n"
+            if len(objects) > 3:
+                append(f"   ... and {len(objects) - 3} more\n")
         
-        output += "\n"  # Empty line between results
+        append("\n")  # Empty line between results
     
-    return output
\ No newline at end of file
+    return "".join(parts)
@@ -8,6 +8,7 @@ This module contains the RTABMapService class and related utilities for:
 - Coordinate transformations and utility functions
 """
 
+import os
 import re
 import time
 import math
@@ -16,73 +17,207 @@ import logging
 import asyncio
 import shutil
 import sqlite3
-import struct
-from typing import Optional, List, Dict
+import tempfile
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Optional, List, Dict, Sequence, Tuple
 from pathlib import Path
 
+# Prefer orjson's faster parser for ObjMeta metadata, fall back to the stdlib.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 # Set up logging
 logger = logging.getLogger("rtabmap")
 
 # Define base data directory
 DATA_DIR = Path("/data")
+# Parent of the scratch processing directories; RAM-backed (/dev/shm) where available so transient
+# files skip the disk, otherwise the platform temp directory
+_SHM_DIR = Path("/dev/shm")
+PROCESSING_ROOT_DIR = Path(
+    os.environ.get("STORE_NAV_TMP")
+    or (_SHM_DIR if _SHM_DIR.is_dir() else Path(tempfile.gettempdir())) / "store_nav"
+)
+SCRATCH_POOL_SIZE = 2  # Reusable processing directories per worker process
+
+# Patterns for parse_localization_output, compiled once at import
+_ANSI_ESCAPE_RE = re.compile(r'\x1B\[[0-9;]*[A-Za-z]')
+# Pattern captures: loop_id, hypothesis - Updated for new format with "high()" instead of "loop()"
+_ITERATION_RE = re.compile(r"iteration\(\d+\).*?(?:loop|high)\((\d+)\).*?hyp\(([\d.]+)\)", re.DOTALL | re.MULTILINE)
+_LOOP_RE = re.compile(r"loop\((\d+)\)")
+_ITERATION_START_RE = re.compile(r"iteration\(\d+\)")
+# Longest rtabmap-console line read in one piece (asyncio's default of 64 KiB is easily hit by verbose logs)
+_CONSOLE_LINE_LIMIT = 16 * 1024 * 1024
+# More flexible hypothesis pattern to catch "hypothesis=X.XX" format too
+_HYP_RE = re.compile(r"(?:hyp\(([\d.]+)\)|hypothesis[=\s]+([\d.]+))")
+
+
+# Element type of a 12-value pose BLOB, keyed by its byte length
+_POSE_BLOB_DTYPES = {12 * 4: np.float32, 12 * 8: np.float64}
+
+# Maximum number of node poses kept by RTABMapService's LRU pose cache
+POSE_CACHE_MAX = 1024
+
+# Below this cos(pitch) a rotation is treated as gimbal-locked when extracting Euler angles
+_GIMBAL_LOCK_EPS = 1e-6
 
 
 # --- Utility Functions ---
 
-def quaternion_to_rpy(qx, qy, qz, qw):
+def remove_processing_dir(path: Path) -> None:
     """
-    Convert a quaternion into Euler angles (roll, pitch, yaw).
-    Returns angles in radians.
+    Best-effort removal of a processing directory tree.
+    Runs in a worker thread so the rmtree never blocks the event loop.
     """
-    # roll (x-axis rotation)
-    sinr_cosp = 2 * (qw * qx + qy * qz)
-    cosr_cosp = 1 - 2 * (qx * qx + qy * qy)
-    roll = math.atan2(sinr_cosp, cosr_cosp)
-
-    # pitch (y-axis rotation)
-    sinp = 2 * (qw * qy - qz * qx)
-    if abs(sinp) >= 1:
-        pitch = math.copysign(math.pi / 2, sinp)  # use 90 degrees if out of range
-    else:
-        pitch = math.asin(sinp)
+    try:
+        shutil.rmtree(path)
+        logger.debug(f"Removed directory: {path}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error(f"Error removing directory {path}: {e}")
+
+def empty_scratch_dir(path: Path) -> None:
+    """
+    Remove everything inside a scratch directory, keeping the directory itself
+    so it can be handed to the next request.
+    """
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.unlink(entry.path)
+
+def ensure_objmeta_index(db_path: Path) -> None:
+    """
+    Make sure ObjMeta has an index leading with frame_id, then refresh the planner
+    statistics with PRAGMA optimize. Best-effort: a read-only or locked database is
+    left as is and per-frame lookups fall back to table scans.
+    """
+    try:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            indexed = conn.execute(
+                "SELECT 1 FROM pragma_index_list('ObjMeta') AS il "
+                "JOIN pragma_index_info(il.name) AS ii ON ii.seqno = 0 WHERE ii.name = 'frame_id'"
+            ).fetchone() is not None
+            if not indexed:
+                logger.info(f"Creating ObjMeta(frame_id) index in {db_path}")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_objmeta_frame_id ON ObjMeta(frame_id)")
+                conn.commit()
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not index ObjMeta in {db_path}: {e}")
+
+def write_exclusive(path: Path, data: bytes) -> None:
+    """
+    Write data to a new file, failing if the path already exists.
+    Uses a direct O_CREAT|O_EXCL open instead of the tempfile machinery.
+    """
+    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+
+async def run_localization_console(cmd: Sequence[str], timeout: float) -> Tuple[Optional[int], str, bool]:
+    """
+    Run rtabmap-console, reading stdout line by line, and stop it as soon as the
+    localization result is settled. parse_localization_output only uses the first
+    iteration match, so once the first iteration line holds a complete match the rest
+    of the run can't change the result. When that match spans lines, the console runs
+    to completion as before.
+
+    Returns:
+        Tuple of (return code, stdout followed by stderr, whether the run was cut short)
+    """
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                                                limit=_CONSOLE_LINE_LIMIT)
+    stderr_task = asyncio.create_task(proc.stderr.read())  # Drained concurrently so the pipe never fills
+    stdout_lines: List[str] = []
+    stopped_early = False
+
+    async def read_until_settled():
+        nonlocal stopped_early
+        watching = True
+        async for raw_line in proc.stdout:
+            line = raw_line.decode(errors='ignore')
+            stdout_lines.append(line)
+            if watching:
+                cleaned_line = _ANSI_ESCAPE_RE.sub('', line) if '\x1b' in line else line
+                if _ITERATION_START_RE.search(cleaned_line):
+                    watching = False
+                    if _ITERATION_RE.search(cleaned_line):
+                        stopped_early = True
+                        proc.terminate()
+                        break
+        await proc.wait()
+        return await stderr_task
+
+    try:
+        stderr_bytes = await asyncio.wait_for(read_until_settled(), timeout=timeout)
+    finally:
+        # On timeout, cancellation or a read error, don't leave the console running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if not stderr_task.done():
+            stderr_task.cancel()
 
-    # yaw (z-axis rotation)
-    siny_cosp = 2 * (qw * qz + qx * qy)
-    cosy_cosp = 1 - 2 * (qy * qy + qz * qz)
-    yaw = math.atan2(siny_cosp, cosy_cosp)
-    return roll, pitch, yaw
+    return proc.returncode, "".join(stdout_lines) + stderr_bytes.decode(errors='ignore'), stopped_early
 
 
-def rotation_matrix_to_quaternion(r11, r12, r13, r21, r22, r23, r31, r32, r33):
+def rotation_matrix_to_rpy(r11, r12, r13, r21, r22, r23, r31, r32, r33):
     """
-    Convert a 3x3 rotation matrix to a quaternion (qx, qy, qz, qw).
+    Convert a 3x3 rotation matrix directly into Euler angles (roll, pitch, yaw).
+    Returns angles in radians.
     """
-    tr = r11 + r22 + r33
-    if tr > 0:
-        S = math.sqrt(tr + 1.0) * 2
-        qw = 0.25 * S
-        qx = (r32 - r23) / S
-        qy = (r13 - r31) / S
-        qz = (r21 - r12) / S
-    elif (r11 > r22) and (r11 > r33):
-        S = math.sqrt(1.0 + r11 - r22 - r33) * 2
-        qw = (r32 - r23) / S
-        qx = 0.25 * S
-        qy = (r12 + r21) / S
-        qz = (r13 + r31) / S
-    elif r22 > r33:
-        S = math.sqrt(1.0 + r22 - r11 - r33) * 2
-        qw = (r13 - r31) / S
-        qx = (r12 + r21) / S
-        qy = 0.25 * S
-        qz = (r23 + r32) / S
-    else:
-        S = math.sqrt(1.0 + r33 - r11 - r22) * 2
-        qw = (r21 - r12) / S
-        qx = (r13 + r31) / S
-        qy = (r23 + r32) / S
-        qz = 0.25 * S
-    return qx, qy, qz, qw
+    cos_pitch = math.hypot(r32, r33)
+    pitch = math.atan2(-r31, cos_pitch)
+    
+    # Gimbal lock (pitch at +/-90 degrees): roll and yaw share one axis, report it as yaw
+    if cos_pitch < _GIMBAL_LOCK_EPS:
+        return 0.0, pitch, math.atan2(-r12, r22)
+    
+    return math.atan2(r32, r33), pitch, math.atan2(r21, r11)
+
+
+def parse_pose_blobs(blobs: List[bytes]) -> np.ndarray:
+    """
+    Decode many RTAB-Map pose BLOBs at once.
+    
+    All blobs must share one length (12 floats or 12 doubles). Vectorized
+    counterpart of rotation_matrix_to_rpy() for the rotation angles.
+    
+    Returns:
+        (N, 6) float64 array of x, y, z, roll, pitch, yaw (radians)
+    """
+    lengths = {len(blob) for blob in blobs}
+    if len(lengths) != 1 or next(iter(lengths)) not in _POSE_BLOB_DTYPES:
+        raise ValueError(f"Pose BLOBs must all be 48 or 96 bytes long, got lengths {sorted(lengths)}")
+    dtype = _POSE_BLOB_DTYPES[lengths.pop()]
+    values = np.frombuffer(b"".join(blobs), dtype=dtype).reshape(-1, 12).astype(np.float64)
+    
+    # RTAB-Map Pose Format: [r11 r12 r13] x y z [r21 r22 r23] [r31 r32 r33]
+    r11, r12, r21, r22 = values[:, 0], values[:, 1], values[:, 6], values[:, 7]
+    r31, r32, r33 = values[:, 9], values[:, 10], values[:, 11]
+    
+    cos_pitch = np.hypot(r32, r33)
+    roll = np.arctan2(r32, r33)
+    pitch = np.arctan2(-r31, cos_pitch)
+    yaw = np.arctan2(r21, r11)
+    
+    # Gimbal lock (pitch at +/-90 degrees): roll and yaw share one axis, report it as yaw
+    locked = cos_pitch < _GIMBAL_LOCK_EPS
+    if locked.any():
+        roll[locked] = 0.0
+        yaw[locked] = np.arctan2(-r12[locked], r22[locked])
+    
+    return np.column_stack((values[:, 3], values[:, 4], values[:, 5], roll, pitch, yaw))
 
 
 def get_frame_global_coordinates(cursor, frame_id: int) -> Optional[Dict]:
@@ -104,15 +239,32 @@ def get_frame_global_coordinates(cursor, frame_id: int) -> Optional[Dict]:
         pose = get_frame_global_coordinates(cursor, 397)
         # Returns: {'x': 7.086, 'y': -36.280, 'z': 0.163, ...}
     """
+    return _read_frame_metadata(cursor, frame_id)[0]
+
+
+def _read_frame_metadata(cursor, frame_id: int) -> Tuple[Optional[Dict], Any]:
+    """
+    Fetch and parse a frame's ObjMeta row once.
+    
+    Returns:
+        Tuple of (global pose dict as returned by get_frame_global_coordinates(),
+        parsed metadata). Either is None when unavailable.
+    """
+    cursor.execute("SELECT metadata_json FROM ObjMeta WHERE frame_id = ?", (frame_id,))
+    result = cursor.fetchone()
+    
+    if not result or not result[0]:
+        logger.warning(f"No metadata found for frame {frame_id}")
+        return None, None
+    
+    return _parse_frame_metadata(result[0], frame_id)
+
+
+def _parse_frame_metadata(metadata_json: str, frame_id: int) -> Tuple[Optional[Dict], Any]:
+    """Parse one ObjMeta metadata_json value into (global pose, parsed metadata)."""
+    metadata = None
     try:
-        cursor.execute("SELECT metadata_json FROM ObjMeta WHERE frame_id = ?", (frame_id,))
-        result = cursor.fetchone()
-        
-        if not result or not result[0]:
-            logger.warning(f"No metadata found for frame {frame_id}")
-            return None
-        
-        metadata = json.loads(result[0])
+        metadata = json_loads(metadata_json)
         
         # Handle dict structure (new format with global_pose)
         if isinstance(metadata, dict) and 'global_pose' in metadata:
@@ -125,14 +277,14 @@ def get_frame_global_coordinates(cursor, frame_id: int) -> Optional[Dict]:
                 'roll': float(pose['roll']),
                 'pitch': float(pose['pitch']),
                 'yaw': float(pose['yaw'])
-            }
+            }, metadata
         
         logger.warning(f"No global_pose in metadata for frame {frame_id}")
-        return None
+        return None, metadata
         
     except (json.JSONDecodeError, KeyError, TypeError) as e:
         logger.error(f"Error parsing global coordinates for frame {frame_id}: {e}")
-        return None
+        return None, metadata
 
 
 def parse_localization_output(output: str) -> Optional[Dict]:
@@ -140,12 +292,12 @@ def parse_localization_output(output: str) -> Optional[Dict]:
     Parse the output from rtabmap-console to extract localization pose and related info.
     Returns a dictionary with pose data and IDs, or None if parsing fails.
     """
-    logger.info("=== parse_localization_output function called! ===")
-    
-    # Remove ANSI escape sequences for clean parsing
-    ansi_escape = re.compile(r'\x1B\[[0-9;]*[A-Za-z]')
-    cleaned_output = ansi_escape.sub('', output)
-    logger.info(f"FULL Cleaned RTAB-Map output:\n{cleaned_output}")
+    # Remove ANSI escape sequences for clean parsing. The substring test is a single
+    # memchr-speed pass, so uncoloured output skips the regex scan entirely
+    cleaned_output = _ANSI_ESCAPE_RE.sub('', output) if '\x1b' in output else output
+    log_debug = logger.isEnabledFor(logging.DEBUG)
+    if log_debug:
+        logger.debug("FULL Cleaned RTAB-Map output:\n%s", cleaned_output)
 
     # Look for ALL iteration lines to see all hypothesis matches
     all_matches = []
@@ -153,68 +305,40 @@ def parse_localization_output(output: str) -> Optional[Dict]:
     hypothesis_value = None
     
     # Pattern: iteration(1) loop(95) hyp(0.03) time=0.104099s/0.104109s *
-    # Use DOTALL and MULTILINE flags to handle newlines between elements
-    logger.info(f"Cleaned output contains 'iteration(' : {'iteration(' in cleaned_output}")
-    if 'iteration(' in cleaned_output:
-        logger.info("Iteration line should be found, checking regex...")
-        for line in cleaned_output.split('\n'):
-            if 'iteration(' in line:
-                logger.info(f"Iteration line found: {repr(line.strip())}")
-    
     # Use multi-line regex with non-greedy matching to handle newlines
-    # Pattern captures: loop_id, hypothesis - Updated for new format with "high()" instead of "loop()"
-    pattern = r"iteration\(\d+\).*?(?:loop|high)\((\d+)\).*?hyp\(([\d.]+)\)"
-    iteration_matches = re.findall(pattern, cleaned_output, re.DOTALL | re.MULTILINE)
-    
-    # Debug: check if the string contains "iteration(" at all
-    if "iteration(" in cleaned_output:
-        logger.info("Found 'iteration(' in output - regex should work")
-        # Find the exact line
-        for line in cleaned_output.split('\n'):
-            if 'iteration(' in line:
-                logger.info(f"Iteration line found: {repr(line.strip())}")
-    else:
-        logger.info("NO 'iteration(' found in cleaned output!")
+    iteration_matches = _ITERATION_RE.findall(cleaned_output)
     
     if iteration_matches:
-        logger.info(f"Found {len(iteration_matches)} iteration matches:")
+        if log_debug:
+            logger.debug("Found %d iteration matches:", len(iteration_matches))
         for i, (match_pic_id, match_hyp) in enumerate(iteration_matches):
             match_pic_id = int(match_pic_id)
             match_hyp = float(match_hyp)
-            logger.info(f"  Match {i+1}: pic_id={match_pic_id}, hypothesis={match_hyp}")
+            if log_debug:
+                logger.debug("  Match %d: pic_id=%d, hypothesis=%s", i + 1, match_pic_id, match_hyp)
             all_matches.append((match_pic_id, match_hyp))
-            
-            # Check if this specific match is node 95
-            if match_pic_id == 95:
-                logger.info(f"FOUND NODE 95! hypothesis={match_hyp}")
         
         # Use the first (highest) match for final result
-        pic_id, hypothesis_value = iteration_matches[0]
-        pic_id = int(pic_id)
-        hypothesis_value = float(hypothesis_value)
+        pic_id, hypothesis_value = all_matches[0]
         
         # Check if hypothesis meets threshold - VERY LOW threshold for camera images 
         if hypothesis_value >= 0.005:  # LOWERED from 0.01 - Accept very weak matches for camera images
-            logger.debug(f"Found valid hypothesis: pic_id={pic_id}, hypothesis={hypothesis_value}")
+            logger.debug("Found valid hypothesis: pic_id=%d, hypothesis=%s", pic_id, hypothesis_value)
             has_valid_match = True
         else:
-            logger.debug(f"Hypothesis below threshold (0.005): pic_id={pic_id}, hypothesis={hypothesis_value}")
+            logger.debug("Hypothesis below threshold (0.005): pic_id=%d, hypothesis=%s", pic_id, hypothesis_value)
             has_valid_match = False
     else:
         logger.debug("No iteration line found with primary pattern, trying fallback patterns")
         
         # Try more flexible patterns as fallback
-        loop_pattern = r"loop\((\d+)\)"
-        loop_matches = re.findall(loop_pattern, cleaned_output)
-        
-        # More flexible hypothesis pattern to catch "hypothesis=X.XX" format too
-        hyp_pattern = r"(?:hyp\(([\d.]+)\)|hypothesis[=\s]+([\d.]+))"
-        hyp_matches_raw = re.findall(hyp_pattern, cleaned_output)
+        loop_matches = _LOOP_RE.findall(cleaned_output)
+        hyp_matches_raw = _HYP_RE.findall(cleaned_output)
         # Flatten the tuple results and filter out empty strings
         hyp_matches = [match for group in hyp_matches_raw for match in group if match]
         
-        logger.info(f"[DEBUG] Fallback loop matches: {loop_matches}")
-        logger.info(f"[DEBUG] Fallback hyp matches: {hyp_matches}")
+        logger.debug("Fallback loop matches: %s", loop_matches)
+        logger.debug("Fallback hyp matches: %s", hyp_matches)
         
         if loop_matches and hyp_matches:
             # Use the first matches
@@ -222,13 +346,13 @@ def parse_localization_output(output: str) -> Optional[Dict]:
             hypothesis_value = float(hyp_matches[0])
             all_matches.append((pic_id, hypothesis_value))
             
-            logger.info(f"[DEBUG] Fallback match found: pic_id={pic_id}, hypothesis={hypothesis_value}")
+            logger.debug("Fallback match found: pic_id=%d, hypothesis=%s", pic_id, hypothesis_value)
             
             if hypothesis_value >= 0.005:  # LOWERED from 0.01
-                logger.debug(f"Found valid fallback hypothesis: pic_id={pic_id}, hypothesis={hypothesis_value}")
+                logger.debug("Found valid fallback hypothesis: pic_id=%d, hypothesis=%s", pic_id, hypothesis_value)
                 has_valid_match = True
             else:
-                logger.debug(f"Fallback hypothesis below threshold (0.005): pic_id={pic_id}, hypothesis={hypothesis_value}")
+                logger.debug("Fallback hypothesis below threshold (0.005): pic_id=%d, hypothesis=%s", pic_id, hypothesis_value)
                 has_valid_match = False
         else:
             logger.debug("No matches found even with fallback patterns")
@@ -259,27 +383,65 @@ class RTABMapService:
     Uses a long-running RTABMap process and communicates with it via temporary files.
     """
     
-    def __init__(self):
+    def __init__(self, max_features: int = 2000, image_pre_decimation: int = 2, sift_gpu: bool = False):
+        """
+        Args:
+            max_features: Keypoints extracted per image (Kp/ and Vis/MaxFeatures). Fewer is faster
+                          to extract and match, at the cost of weaker matches
+            image_pre_decimation: Downsampling factor applied before feature extraction
+                                  (Mem/ImagePreDecimation). SIFT cost scales with pixel count
+            sift_gpu: Run SIFT on the GPU when the rtabmap build supports it
+        """
+        self.max_features = max_features
+        self.image_pre_decimation = image_pre_decimation
+        self.sift_gpu = sift_gpu
         self.db_path: Optional[Path] = None
         self.metadata_db_path: Optional[Path] = None
         self.is_initialized = False
-        self.lock = asyncio.Lock()
+        self.lock = asyncio.Lock()  # Guards (re)initialization
+        self._rtabmap_sem = asyncio.Semaphore(1)  # One rtabmap-console run at a time
         self.image_counter = 0
         self.base_rtabmap_params: List[str] = [] # Base parameters for rtabmap-console
+        self._cmd_prefix: Tuple[str, ...] = ()  # rtabmap-console argv up to the input directory
+        self._scratch_root: Optional[Path] = None  # This process's scratch directories live here
+        self._scratch_pool: Optional[asyncio.Queue] = None  # Idle scratch directories, ready for a request
+        self._metadata_conn: Optional[sqlite3.Connection] = None  # Reused across pose lookups
+        # node_id -> pose dict, least recently used first. Poses don't change in localization
+        # mode (Mem/IncrementalMemory=false), so entries only go stale when the DB changes.
+        self._pose_cache: "OrderedDict[int, dict]" = OrderedDict()
+
+    def _metadata_connection(self) -> sqlite3.Connection:
+        """
+        Return the persistent connection to the metadata database, opening it on first use.
+        The database is only read here, so it is opened read-only and keeps its prepared
+        statements cached across requests.
+        """
+        if self._metadata_conn is None:
+            self._metadata_conn = sqlite3.connect(
+                f"{self.metadata_db_path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                cached_statements=128
+            )
+            self._metadata_conn.execute("PRAGMA mmap_size=268435456")  # Read pages via mmap (256 MB window)
+        return self._metadata_conn
+
+    def _close_metadata_connection(self):
+        """Close the persistent metadata database connection, if open."""
+        if self._metadata_conn is not None:
+            self._metadata_conn.close()
+            self._metadata_conn = None
 
     def _parse_and_format_pose(self, node_id, pose_data, precision=5):
         """Helper to parse pose data from DB (blob or string) and format it."""
         try:
             if isinstance(pose_data, bytes):
-                if len(pose_data) == 12 * 4:  # 12 floats
-                    values = struct.unpack('12f', pose_data)
-                    logger.debug(f"Unpacked 12 floats for node {node_id}: {values}")
-                elif len(pose_data) == 12 * 8:  # 12 doubles
-                    values = struct.unpack('12d', pose_data)
-                    logger.debug(f"Unpacked 12 doubles for node {node_id}: {values}")
-                else:
+                dtype = _POSE_BLOB_DTYPES.get(len(pose_data))  # 12 floats or 12 doubles
+                if dtype is None:
                     logger.warning(f"Skipping node {node_id}: Pose data BLOB has unexpected length: {len(pose_data)}")
                     return None
+                values = np.frombuffer(pose_data, dtype=dtype).tolist()
+                logger.debug(f"Unpacked 12 {dtype.__name__} values for node {node_id}: {values}")
             elif isinstance(pose_data, str):
                 values = [float(x) for x in pose_data.split()]
                 if len(values) != 12:
@@ -300,9 +462,8 @@ class RTABMapService:
             
             logger.debug(f"Translation values for node {node_id}: tx={tx}, ty={ty}, tz={tz}")
             
-            # Convert rotation matrix to quaternion, then to Euler angles (roll, pitch, yaw)
-            qx, qy, qz, qw = rotation_matrix_to_quaternion(r11, r12, r13, r21, r22, r23, r31, r32, r33)
-            roll, pitch, yaw = quaternion_to_rpy(qx, qy, qz, qw)
+            # Convert rotation matrix to Euler angles (roll, pitch, yaw)
+            roll, pitch, yaw = rotation_matrix_to_rpy(r11, r12, r13, r21, r22, r23, r31, r32, r33)
             
             # Return the formatted pose dictionary
             result = {
@@ -319,6 +480,110 @@ class RTABMapService:
             logger.error(f"Error processing pose for node {node_id}: {e}")
             return None
 
+    @staticmethod
+    def _format_stored_pose(node_id: int, global_pose: Dict, metadata: Dict) -> dict:
+        """Round a frame's global pose and attach its object descriptions."""
+        # Start with global pose data
+        parsed_pose = {
+            "x": round(global_pose['x'], 2),
+            "y": round(global_pose['y'], 2),
+            "z": round(global_pose['z'], 2),
+            "roll": round(global_pose['roll'], 5),
+            "pitch": round(global_pose['pitch'], 5),
+            "yaw": round(global_pose['yaw'], 5)
+        }
+        
+        logger.debug(f"Global coordinates for node {node_id}: x={parsed_pose['x']}, y={parsed_pose['y']}, z={parsed_pose['z']}")
+        
+        # Extract objects list (metadata holding a global_pose is always a dict)
+        objects = metadata.get('objects', [])
+        
+        # Format objects as a readable string, joined with " •• " separator
+        parsed_pose["objects"] = " •• ".join(
+            f"{obj.get('class_name', 'Unknown')}: {obj.get('notes', 'No description available')}"
+            for obj in objects
+        )
+        logger.info(f"Added {len(objects)} objects metadata for node {node_id}")
+        return parsed_pose
+
+    def _ensure_scratch_pool(self) -> asyncio.Queue:
+        """
+        Return the pool of scratch directories, creating it on first use so callers that
+        never process an image (e.g. the CLI) leave nothing behind.
+        """
+        if self._scratch_pool is None:
+            self._scratch_root = PROCESSING_ROOT_DIR / f"pool_{os.getpid()}"  # Workers may share PROCESSING_ROOT_DIR
+            scratch_pool = asyncio.Queue()
+            for i in range(SCRATCH_POOL_SIZE):
+                scratch_dir = self._scratch_root / f"scratch_{i}"
+                scratch_dir.mkdir(parents=True, exist_ok=True)
+                empty_scratch_dir(scratch_dir)  # Leftovers from an earlier process with the same pid
+                scratch_pool.put_nowait(scratch_dir)
+            self._scratch_pool = scratch_pool
+        return self._scratch_pool
+
+    def _cached_pose(self, node_id: int) -> Optional[dict]:
+        """Return a copy of a cached pose (marking it recently used), or None on a miss."""
+        pose = self._pose_cache.get(node_id)
+        if pose is None:
+            return None
+        self._pose_cache.move_to_end(node_id)
+        return dict(pose)
+
+    def _cache_pose(self, node_id: int, pose: dict):
+        """Store a copy of a pose, evicting the least recently used entry when full."""
+        self._pose_cache[node_id] = dict(pose)
+        self._pose_cache.move_to_end(node_id)
+        if len(self._pose_cache) > POSE_CACHE_MAX:
+            self._pose_cache.popitem(last=False)
+
+    async def get_stored_node_poses(self, node_ids: List[int]) -> Dict[int, dict]:
+        """
+        Batch form of get_stored_node_pose(): fetches the GLOBAL poses of many nodes
+        with a single ObjMeta query.
+        
+        Returns:
+            Dict mapping node_id to its pose dict; nodes without usable metadata are omitted
+        """
+        if not self.metadata_db_path:
+            logger.error("Metadata database path not set")
+            return {}
+        poses = {}
+        unique_ids = []
+        for node_id in dict.fromkeys(node_ids):
+            cached = self._cached_pose(node_id)
+            if cached is not None:
+                poses[node_id] = cached
+            else:
+                unique_ids.append(node_id)
+        if not unique_ids:
+            return poses
+        
+        try:
+            placeholders = ",".join("?" * len(unique_ids))
+            rows = self._metadata_connection().execute(
+                f"SELECT frame_id, metadata_json FROM ObjMeta WHERE frame_id IN ({placeholders})", unique_ids
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error querying database for nodes {unique_ids}: {e}")
+            return poses
+        
+        for node_id, metadata_json in rows:
+            if node_id in poses or not metadata_json:
+                continue  # Keep the first row per frame, as the single-node lookup does
+            try:
+                global_pose, metadata = _parse_frame_metadata(metadata_json, node_id)
+                if global_pose:
+                    poses[node_id] = self._format_stored_pose(node_id, global_pose, metadata)
+                    self._cache_pose(node_id, poses[node_id])
+            except Exception as e:
+                logger.error(f"Error processing pose for node {node_id}: {e}")
+        
+        missing = [node_id for node_id in unique_ids if node_id not in poses]
+        if missing:
+            logger.warning(f"No global coordinates found for nodes {missing}")
+        return poses
+
     async def get_stored_node_pose(self, node_id: int) -> Optional[dict]:
         """
         Retrieves the GLOBAL pose from metadata and includes object descriptions.
@@ -331,81 +596,29 @@ class RTABMapService:
         if not self.metadata_db_path:
             logger.error("Metadata database path not set")
             return None
+        
+        cached = self._cached_pose(node_id)
+        if cached is not None:
+            logger.debug(f"Pose cache hit for node {node_id}")
+            return cached
             
         try:
-            conn = sqlite3.connect(str(self.metadata_db_path))
-            cursor = conn.cursor()
+            cursor = self._metadata_connection().cursor()
             
-            # Get global coordinates from metadata
-            global_pose = get_frame_global_coordinates(cursor, node_id)
+            # Get global coordinates and object metadata from a single ObjMeta lookup
+            global_pose, metadata = _read_frame_metadata(cursor, node_id)
             
             if not global_pose:
                 logger.error(f"No global coordinates found for node {node_id}")
-                conn.close()
                 return None
             
-            # Start with global pose data
-            parsed_pose = {
-                "x": round(global_pose['x'], 2),
-                "y": round(global_pose['y'], 2),
-                "z": round(global_pose['z'], 2),
-                "roll": round(global_pose['roll'], 5),
-                "pitch": round(global_pose['pitch'], 5),
-                "yaw": round(global_pose['yaw'], 5)
-            }
-            
-            logger.debug(f"Global coordinates for node {node_id}: x={parsed_pose['x']}, y={parsed_pose['y']}, z={parsed_pose['z']}")
+            parsed_pose = self._format_stored_pose(node_id, global_pose, metadata)
+            self._cache_pose(node_id, parsed_pose)
             
-            # Query for object metadata from ObjMeta table
-            try:
-                cursor.execute("SELECT metadata_json FROM ObjMeta WHERE frame_id = ?", (node_id,))
-                metadata_result = cursor.fetchone()
-                
-                if metadata_result and metadata_result[0]:
-                    # Parse the JSON metadata
-                    metadata = json.loads(metadata_result[0])
-                    
-                    # Extract objects list (handle both dict and list formats)
-                    if isinstance(metadata, dict):
-                        objects = metadata.get('objects', [])
-                    elif isinstance(metadata, list):
-                        objects = metadata
-                    else:
-                        objects = []
-                    
-                    # Format objects as a readable string
-                    object_descriptions = []
-                    for obj in objects:
-                        class_name = obj.get("class_name", "Unknown")
-                        notes = obj.get("notes", "No description available")
-                        formatted_obj = f"{class_name}: {notes}"
-                        object_descriptions.append(formatted_obj)
-
-                    # Join all objects with " •• " separator
-                    objects_string = " •• ".join(object_descriptions)
-                    parsed_pose["objects"] = objects_string
-                    logger.info(f"Added {len(objects)} objects metadata for node {node_id}")
-                else:
-                    # No metadata found, set empty string
-                    parsed_pose["objects"] = ""
-                    logger.debug(f"No object metadata found for node {node_id}")
-                    
-            except sqlite3.Error as meta_error:
-                # ObjMeta table might not exist or other DB error
-                logger.warning(f"Could not fetch object metadata for node {node_id}: {meta_error}")
-                parsed_pose["objects"] = ""
-            except json.JSONDecodeError as json_error:
-                # Invalid JSON in metadata
-                logger.warning(f"Invalid JSON in metadata for node {node_id}: {json_error}")
-                parsed_pose["objects"] = ""
-            
-            conn.close()
             logger.info(f"Successfully retrieved GLOBAL pose for node {node_id}: x={parsed_pose['x']}, y={parsed_pose['y']}, z={parsed_pose['z']}")
             return parsed_pose
         except Exception as e:
             logger.error(f"Error querying database for node {node_id}: {e}")
-            if 'conn' in locals():
-                conn.close()
             return None
 
     async def initialize(self, db_path_obj: Path, metadata_db_path_obj: Optional[Path] = None) -> bool:
@@ -445,7 +658,15 @@ class RTABMapService:
                 self.metadata_db_path = db_path_obj
             
             logger.info(f"Using metadata database: {self.metadata_db_path}")
-
+            
+            # Index frame lookups, then open the metadata connection up front so the
+            # first request doesn't pay for it
+            await asyncio.to_thread(ensure_objmeta_index, self.metadata_db_path)
+            try:
+                self._metadata_connection()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not open metadata database {self.metadata_db_path}: {e}")
+            
             # RTAB-Map Console Parameters - Optimized for High-Performance Headless Localization
             # Based on GitHub Issues #1528, #358, #1507 analysis for API workloads
             self.base_rtabmap_params = [
@@ -478,14 +699,14 @@ class RTABMapService:
                 "--SIFT/EdgeThreshold", "10",                   # SIFT edge threshold (filters edge-like features)
                 "--SIFT/NOctaveLayers", "3",                    # Number of octave layers in SIFT pyramid
                 "--SIFT/Sigma", "1.6",                          # Gaussian blur sigma for SIFT
-                "--SIFT/Gpu", "false",                          # Force CPU processing (more deterministic than GPU)
+                "--SIFT/Gpu", "true" if self.sift_gpu else "false",  # CPU by default (more deterministic than GPU)
                 "--SIFT/PreciseUpscale", "false",               # Disable precise upscaling
                 "--SIFT/RootSIFT", "false",                     # Disable RootSIFT normalization
                 "--SIFT/Upscale", "false",                      # Disable image upscaling before detection
                 
                 # === FEATURE EXTRACTION OPTIMIZATION - INCREASED FOR CAMERA MATCHING ===
-                "--Kp/MaxFeatures", "2000",                     # INCREASED from 1000 - Extract more features for better matching
-                "--Vis/MaxFeatures", "2000",                    # Match keypoint features
+                "--Kp/MaxFeatures", str(self.max_features),     # 2000 by default (INCREASED from 1000) - more features for better matching
+                "--Vis/MaxFeatures", str(self.max_features),    # Match keypoint features
                 
                 # === SPATIAL GRID PARAMETERS - CRITICAL FOR DETERMINISM ===
                 "--Kp/GridCols", "1",                          # Single column grid (no spatial subdivision)
@@ -513,7 +734,7 @@ class RTABMapService:
                 "--Vis/SubPixIterations", "0",                 # DISABLE visual subpixel iterations
                 
                 # === IMAGE PREPROCESSING ===
-                "--Mem/ImagePreDecimation", "2",               # Downsample images by factor of 2 before processing
+                "--Mem/ImagePreDecimation", str(self.image_pre_decimation),  # Downsample images before processing (2 by default)
                 "--Mem/ImagePostDecimation", "1",              # No post-processing decimation
                 
                 # === RANDOMNESS ELIMINATION - CRITICAL FOR DETERMINISTIC RESULTS ===
@@ -561,118 +782,134 @@ class RTABMapService:
                 "--logconsole",                                # Enable console logging
                 "--uinfo"                                      # Set log level to INFO for detailed output
             ]
+            # Build the invariant part of the command once; each request only appends its directory
+            self._cmd_prefix = ("rtabmap-console", "-input", str(self.db_path), *self.base_rtabmap_params)
 
             # The service is now considered "initialized" and ready for processing.
             logger.info("RTAB-Map service initialized and ready for processing.")
             self.is_initialized = True
             return True
 
-    async def process_image(self, image_path: Path) -> Dict:
+    async def process_image(self, image_path: Optional[Path] = None, image_bytes: Optional[bytes] = None,
+                            image_name: Optional[str] = None) -> Dict:
         """
         Process an image for localization against the loaded database.
         
         Args:
             image_path: Path to the image file to process
+            image_bytes: Encoded image held in memory (alternative to image_path). It is
+                         written directly into the processing directory, avoiding a copy
+            image_name: File name (with extension) to use for image_bytes
             
         Returns:
             Dictionary containing localization results
         """
         if not self.is_initialized or not self.db_path:
             raise RuntimeError("RTAB-Map service not initialized or DB path not set.")
-
-        async with self.lock:
-            # Create a temporary directory for processing
-            self.image_counter += 1
-            request_id = f"req_{self.image_counter}_{int(time.time())}"
-            image_processing_dir = DATA_DIR / f"temp_proc_{request_id}"
+        if image_path is None and image_bytes is None:
+            raise ValueError("Either image_path or image_bytes must be provided.")
+
+        # Take an idle scratch directory for processing
+        self.image_counter += 1
+        scratch_pool = self._ensure_scratch_pool()  # A re-initialize may swap the pool while this request runs
+        image_processing_dir = await scratch_pool.get()
+        if image_path is not None:
             image_name = image_path.name
-            start_time_total = time.perf_counter()
+        elif not image_name:
+            image_name = "image.jpg"
+        start_time_total = time.perf_counter()
+        
+        try:
+            # Place the image in the (empty) scratch directory
+            target_image_in_processing_dir = image_processing_dir / image_name
+            if image_bytes is not None:
+                await asyncio.to_thread(write_exclusive, target_image_in_processing_dir, image_bytes)
+            else:
+                try:
+                    os.link(image_path, target_image_in_processing_dir)  # No bytes copied on the same filesystem
+                except OSError:
+                    shutil.copy(image_path, target_image_in_processing_dir)
+
+            # Run localization with base parameters
+            per_image_cmd = (*self._cmd_prefix, str(image_processing_dir))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Running command: {' '.join(per_image_cmd)}")
+            async with self._rtabmap_sem:
+                returncode, output_text_localization, stopped_early = await run_localization_console(per_image_cmd, timeout=60.0)
+            
+            if stopped_early:
+                logger.info("RTAB-Map command stopped once the iteration result was read")
+            else:
+                logger.info(f"RTAB-Map command completed with return code: {returncode}")
+            logger.info(f"FULL RTAB-Map output:\n{output_text_localization}")
             
+            if returncode != 0 and not stopped_early:
+                logger.error(f"RTAB-Map processing failed for {image_name}. RC={returncode}")
+            
+            logger.info("About to call parse_localization_output...")
             try:
-                # Prepare the processing directory
-                image_processing_dir.mkdir(parents=True, exist_ok=True)
-                target_image_in_processing_dir = image_processing_dir / image_name
-                shutil.copy(image_path, target_image_in_processing_dir)
-
-                # Run localization with base parameters
-                per_image_cmd = ["rtabmap-console", "-input", str(self.db_path)] + self.base_rtabmap_params + [str(image_processing_dir)]
-                logger.info(f"Running command: {' '.join(per_image_cmd)}")
-                proc_img_loc = await asyncio.create_subprocess_exec(*per_image_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
-                stdout_bytes, stderr_bytes = await asyncio.wait_for(proc_img_loc.communicate(), timeout=60.0)
-                output_text_localization = stdout_bytes.decode(errors='ignore') + stderr_bytes.decode(errors='ignore')
-                
-                logger.info(f"RTAB-Map command completed with return code: {proc_img_loc.returncode}")
-                logger.info(f"FULL RTAB-Map output:\n{output_text_localization}")
-                
-                if proc_img_loc.returncode != 0:
-                    logger.error(f"RTAB-Map processing failed for {image_name}. RC={proc_img_loc.returncode}")
-                
-                logger.info("About to call parse_localization_output...")
-                try:
-                    final_pose_data = parse_localization_output(output_text_localization)
-                    logger.info(f"parse_localization_output returned: {final_pose_data}")
-                except Exception as e:
-                    logger.error(f"Exception in parse_localization_output: {e}")
-                    final_pose_data = None
-
-                if final_pose_data:
-                    pic_id_matched = final_pose_data.get("pic_id")
-                    if pic_id_matched is not None and final_pose_data.get("localization_successful"):
-                        logger.info(f"Attempting to retrieve stored GLOBAL pose for pic_id {pic_id_matched}")
-                        stored_pose = await self.get_stored_node_pose(pic_id_matched)
-                        if stored_pose:
-                            # Use the stored GLOBAL pose and add the additional metadata
-                            # CRITICAL: stored_pose contains GLOBAL coordinates from ObjMeta
-                            logger.info(f"Retrieved GLOBAL coordinates: X={stored_pose.get('x'):.3f}, Y={stored_pose.get('y'):.3f}, Z={stored_pose.get('z'):.3f}")
-                            
-                            # Build result with GLOBAL coordinates
-                            final_pose_data = {
-                                "localization_successful": True,
-                                "pic_id": pic_id_matched,
-                                "hypothesis_value": final_pose_data.get("hypothesis_value"),
-                                # GLOBAL POSITION (from ObjMeta database)
-                                "x": stored_pose.get("x", 0),
-                                "y": stored_pose.get("y", 0),
-                                "z": stored_pose.get("z", 0),
-                                # GLOBAL ORIENTATION
-                                "roll": stored_pose.get("roll", 0),
-                                "pitch": stored_pose.get("pitch", 0),
-                                "yaw": stored_pose.get("yaw", 0),
-                                # OBJECT METADATA
-                                "objects": stored_pose.get("objects", ""),
-                                # PROCESSING METADATA
-                                "image_name": image_name,
-                                "elapsed_ms": int((time.perf_counter() - start_time_total) * 1000)
-                            }
-                            logger.info(f"Successfully retrieved GLOBAL pose for frame {pic_id_matched}")
-                            return final_pose_data
-                        else:
-                            logger.error(f"Failed to get GLOBAL pose for pic_id {pic_id_matched}")
-                            return {
-                                "error": f"Failed to retrieve GLOBAL coordinates for matched image {pic_id_matched}",
-                                "image_name": image_name,
-                                "elapsed_ms": int((time.perf_counter() - start_time_total) * 1000)
-                            }
-                
-                    raise RuntimeError(f"No valid localization match found for {image_name}")
-
-                raise RuntimeError(f"Failed to get localization results for {image_name}.")
-
-            except (TimeoutError, RuntimeError, Exception) as e:
-                logger.exception(f"Error processing {image_name}: {e}")
-                return {
-                    "error": f"{type(e).__name__}: {e}", 
-                    "image_name": image_name, 
-                    "elapsed_ms": int((time.perf_counter() - start_time_total) * 1000)
-                }
-            finally:
-                # Always clean up the temporary directory
-                if image_processing_dir.exists():
-                    try:
-                        shutil.rmtree(image_processing_dir)
-                        logger.debug(f"Removed directory: {image_processing_dir}")
-                    except Exception as e:
-                        logger.error(f"Error removing directory {image_processing_dir}: {e}")
+                final_pose_data = parse_localization_output(output_text_localization)
+                logger.info(f"parse_localization_output returned: {final_pose_data}")
+            except Exception as e:
+                logger.error(f"Exception in parse_localization_output: {e}")
+                final_pose_data = None
+
+            if final_pose_data:
+                pic_id_matched = final_pose_data.get("pic_id")
+                if pic_id_matched is not None and final_pose_data.get("localization_successful"):
+                    logger.info(f"Attempting to retrieve stored GLOBAL pose for pic_id {pic_id_matched}")
+                    stored_pose = await self.get_stored_node_pose(pic_id_matched)
+                    if stored_pose:
+                        # Use the stored GLOBAL pose and add the additional metadata
+                        # CRITICAL: stored_pose contains GLOBAL coordinates from ObjMeta
+                        logger.info(f"Retrieved GLOBAL coordinates: X={stored_pose.get('x'):.3f}, Y={stored_pose.get('y'):.3f}, Z={stored_pose.get('z'):.3f}")
+                        
+                        # Extend the parsed result (localization_successful, pic_id,
+                        # hypothesis_value) with GLOBAL coordinates in place
+                        del final_pose_data["all_matches"]  # Debugging detail, not part of the result
+                        final_pose_data.update(
+                            # GLOBAL POSITION (from ObjMeta database)
+                            x=stored_pose.get("x", 0),
+                            y=stored_pose.get("y", 0),
+                            z=stored_pose.get("z", 0),
+                            # GLOBAL ORIENTATION
+                            roll=stored_pose.get("roll", 0),
+                            pitch=stored_pose.get("pitch", 0),
+                            yaw=stored_pose.get("yaw", 0),
+                            # OBJECT METADATA
+                            objects=stored_pose.get("objects", ""),
+                            # PROCESSING METADATA
+                            image_name=image_name,
+                            elapsed_ms=int((time.perf_counter() - start_time_total) * 1000)
+                        )
+                        logger.info(f"Successfully retrieved GLOBAL pose for frame {pic_id_matched}")
+                        return final_pose_data
+                    else:
+                        logger.error(f"Failed to get GLOBAL pose for pic_id {pic_id_matched}")
+                        return {
+                            "error": f"Failed to retrieve GLOBAL coordinates for matched image {pic_id_matched}",
+                            "image_name": image_name,
+                            "elapsed_ms": int((time.perf_counter() - start_time_total) * 1000)
+                        }
+            
+                raise RuntimeError(f"No valid localization match found for {image_name}")
+
+            raise RuntimeError(f"Failed to get localization results for {image_name}.")
+
+        except (TimeoutError, RuntimeError, Exception) as e:
+            logger.exception(f"Error processing {image_name}: {e}")
+            return {
+                "error": f"{type(e).__name__}: {e}", 
+                "image_name": image_name, 
+                "elapsed_ms": int((time.perf_counter() - start_time_total) * 1000)
+            }
+        finally:
+            # Empty the scratch directory and hand it back to the pool
+            try:
+                empty_scratch_dir(image_processing_dir)
+            except OSError as e:
+                logger.error(f"Error emptying scratch directory {image_processing_dir}: {e}")
+            scratch_pool.put_nowait(image_processing_dir)
 
     async def shutdown(self):
         """
@@ -680,9 +917,19 @@ class RTABMapService:
         """
         logger.info("Shutting down RTAB-Map service...")
         
+        # Remove this process's scratch directories
+        if self._scratch_root is not None:
+            await asyncio.to_thread(remove_processing_dir, self._scratch_root)
+            self._scratch_root = None
+            self._scratch_pool = None
+
+        self._close_metadata_connection()
+        self._pose_cache.clear()
+
         # Reset service state
         self.db_path = None
         self.metadata_db_path = None
+        self._cmd_prefix = ()
         self.is_initialized = False
         logger.info("RTAB-Map service shutdown complete.")
 
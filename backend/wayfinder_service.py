@@ -10,13 +10,17 @@ This module handles all Wayfinder integration including:
 import math
 import logging
 import httpx
-from typing import Dict
+from typing import Dict, Optional
 
 # Set up logging
 logger = logging.getLogger("wayfinder")
 
 # --- Wayfinder Integration Configuration ---
 WAYFINDER_URL = "https://jennet-crisp-molly.ngrok-free.app/wayfinder"
+WAYFINDER_TIMEOUT = 10.0  # seconds
+
+# Shared HTTP client so repeated calls reuse the TLS connection to the ngrok host
+_wayfinder_client: Optional[httpx.AsyncClient] = None
 
 # --- Coordinate System Transformation ---
 
@@ -79,6 +83,25 @@ def transform_coordinates(x1: float, y1: float) -> Dict[str, float]:
     return {"x": round(x2, 2), "y": round(y2, 2)}
 
 
+def get_wayfinder_client() -> httpx.AsyncClient:
+    """
+    Returns the shared Wayfinder HTTP client, creating it on first use.
+    HTTP/2 is enabled so subsequent requests multiplex over the same TLS session.
+    """
+    global _wayfinder_client
+    if _wayfinder_client is None or _wayfinder_client.is_closed:
+        _wayfinder_client = httpx.AsyncClient(http2=True, timeout=WAYFINDER_TIMEOUT)
+    return _wayfinder_client
+
+
+async def close_wayfinder_client():
+    """Closes the shared Wayfinder HTTP client if it was created."""
+    global _wayfinder_client
+    if _wayfinder_client is not None:
+        await _wayfinder_client.aclose()
+        _wayfinder_client = None
+
+
 async def send_to_wayfinder(x: float, y: float) -> Dict:
     """
     Sends the user's current X and Y coordinates to the wayfinder API.
@@ -97,12 +120,12 @@ async def send_to_wayfinder(x: float, y: float) -> Dict:
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            logger.info(f"Sending to wayfinder: {payload}")
-            response = await client.post(WAYFINDER_URL, json=payload)
-            response.raise_for_status()  # Raise an exception for non-2xx status codes
-            logger.info(f"Successfully sent coordinates to wayfinder. Response: {response.json()}")
-            return response.json()
+        client = get_wayfinder_client()
+        logger.info(f"Sending to wayfinder: {payload}")
+        response = await client.post(WAYFINDER_URL, json=payload)
+        response.raise_for_status()  # Raise an exception for non-2xx status codes
+        logger.info(f"Successfully sent coordinates to wayfinder. Response: {response.json()}")
+        return response.json()
     except httpx.RequestError as e:
         logger.error(f"Error sending coordinates to wayfinder: {e}")
         return {"error": str(e)}
@@ -34,6 +34,7 @@ standalone CLI script, ensuring consistent behavior across both interfaces.
 """
 
 import time
+import asyncio
 import logging
 import os
 from typing import Dict, Any, List, Optional
@@ -42,6 +43,7 @@ from pathlib import Path
 # Import existing functionality
 from search_product import search_products
 from rtabmap_service import RTABMapService
+from navigation_guidance import add_navigation_guidance
 
 # Set up logging
 logger = logging.getLogger("workflow_service")
@@ -68,7 +70,8 @@ class WorkflowService:
         self.database_path = database_path
         self.metadata_db_path = metadata_db_path
     
-    async def execute_workflow(self, object_name: str, include_timing: bool = True, image_path: Optional[Path] = None) -> Dict[str, Any]:
+    async def execute_workflow(self, object_name: str, include_timing: bool = True, image_path: Optional[Path] = None,
+                               image_bytes: Optional[bytes] = None, image_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute the complete search-and-localize workflow.
         
@@ -79,6 +82,9 @@ class WorkflowService:
             object_name: The object to search for
             include_timing: Whether to include timing information in response
             image_path: Optional path to uploaded image. If None, uses test image from external directory
+            image_bytes: Optional in-memory uploaded image. Takes precedence over image_path and is
+                         written straight into RTAB-Map's processing directory
+            image_name: File name (with extension) to use for image_bytes
             
         Returns:
             Dictionary containing:
@@ -110,7 +116,8 @@ class WorkflowService:
             search_start_time = time.time()
             
             try:
-                search_results = search_products(
+                search_results = await asyncio.to_thread(
+                    search_products,
                     search_term=object_name,
                     db_path=self.metadata_db_path,
                     use_sql_prefilter=True,
@@ -133,17 +140,14 @@ class WorkflowService:
                 }
             
             # Step 3: Convert search results to API format
-            formatted_search_results = []
-            for result in search_results:
-                formatted_result = {
+            formatted_search_results = [
+                {
                     "frame_id": result['frame_id'],
-                    "location": {
-                        "x": result['x'],
-                        "y": result['y']
-                    },
+                    "location": {"x": result['x'], "y": result['y']},
                     "objects": result['objects']
                 }
-                formatted_search_results.append(formatted_result)
+                for result in search_results
+            ]
             
             # Step 4: Automatically trigger localization
             logger.info("Starting automatic localization...")
@@ -151,7 +155,15 @@ class WorkflowService:
             
             try:
                 # Determine which image to use for localization
-                if image_path:
+                if image_bytes is not None:
+                    # Use the uploaded image held in memory (webapp integration)
+                    logger.info(f"Using in-memory uploaded image for localization: {image_name}")
+                    target_image_path = None
+                    localization_result = await self.rtabmap_service.process_image(
+                        image_bytes=image_bytes,
+                        image_name=image_name
+                    )
+                elif image_path:
                     # Use the provided uploaded image (webapp integration)
                     logger.info(f"Using uploaded image for localization: {image_path}")
                     target_image_path = image_path
@@ -210,6 +222,8 @@ class WorkflowService:
                 # Process the image if we have a path
                 if target_image_path:
                     localization_result = await self.rtabmap_service.process_image(target_image_path)
+                
+                if target_image_path or image_bytes is not None:
                     localization_elapsed = (time.time() - localization_start_time) * 1000
                     
                     if localization_result and localization_result.get("localization_successful"):
@@ -269,8 +283,6 @@ class WorkflowService:
             
             if success and formatted_localization and formatted_search_results:
                 try:
-                    from navigation_guidance import add_navigation_guidance
-                    
                     user_position = formatted_localization["position"]
                     user_yaw = formatted_localization["orientation"]["yaw"]
                     
@@ -297,7 +309,7 @@ class WorkflowService:
                         nearest_frame_id = nav["target_frame_id"]
                         total_distance_to_target = nav["distance"]
                         
-                        # Update search results with distance information
+                        # Return search results ordered by distance from the user
                         formatted_search_results = navigation_data["all_frames_with_distances"]
                         
                         # NEW: Generate route details with intermediate frames - COMMENTED OUT FOR WEBAPP ONLY